@@ -2,13 +2,35 @@
 """
 Script to help identify all localStorage calls that need to be updated
 to use userDataStorage utility for user-specific data isolation.
+
+Findings are cached per file (see fixes/filecache.py), so reruns only
+rescan files that changed; pass --no-cache to rescan everything.
+
+With --watch it keeps running: files are re-analyzed as they are saved
+(inotify, or polling with --poll) and the report is redrawn from findings
+kept in memory.
+
+With --verify it instead checks client/src against the isolation rules in
+fixes/isolation.rules (forbidden storage calls per key, with allowlists)
+and exits 1 if any are broken; --json prints the result for CI. Each rule
+must first catch the seeded leaks in fixes/isolation.py (plain, window.
+and inside template substitutions), or it exits 2.
 """
 
-import os
-import re
+import argparse
+import json
+import sys
+import time
 from pathlib import Path
 
-workspace_root = Path("/Users/pratiktanikella/Vivaha_repo")
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'fixes'))
+import isolation
+import tstokens
+import watch
+from codemod import discover_files
+from filecache import FileCache, fingerprint
+
+workspace_root = Path(__file__).resolve().parents[1]
 client_src = workspace_root / "client/src/components/dashboard"
 
 # Files to update
@@ -22,40 +44,191 @@ files_to_update = [
     "VendorSearch.tsx",
 ]
 
-# Pattern to find localStorage.setItem/getItem calls
+# User-specific keys that belong in userDataStorage
+storage_keys = {'guests', 'budget', 'todos', 'myVendors', 'ceremonies', 'playlists', 'seatingCharts',
+                'weddingPlaylists'}
+
+# localStorage calls to find, and what each becomes
 patterns = [
-    (r"localStorage\.getItem\('(guests|budget|todos|myVendors|ceremonies|playlists|seatingCharts|weddingPlaylists)'\)", 
-     r"userDataStorage.getData('\1')"),
-    
-    (r"localStorage\.setItem\('(guests|budget|todos|myVendors|ceremonies|playlists|seatingCharts|weddingPlaylists)',\s*JSON\.stringify\(([^)]+)\)\)",
-     r"userDataStorage.setData('\1', \2)"),
-    
-    (r"localStorage\.removeItem\('(guests|budget|todos|myVendors|ceremonies|playlists|seatingCharts|weddingPlaylists)'\)",
-     r"userDataStorage.removeData('\1')"),
+    ("localStorage.getItem(key)", "userDataStorage.getData(key)"),
+    ("localStorage.setItem(key, JSON.stringify(value))", "userDataStorage.setData(key, value)"),
+    ("localStorage.removeItem(key)", "userDataStorage.removeData(key)"),
 ]
 
-for file_name in files_to_update:
-    file_path = client_src / file_name
-    if not file_path.exists():
-        print(f"❌ File not found: {file_path}")
-        continue
-    
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    print(f"\n📄 {file_name}")
-    print("=" * 60)
-    
-    # Find all localStorage calls
-    for pattern, replacement in patterns:
-        matches = re.findall(pattern, content)
-        if matches:
+def match_call(call):
+    """(pattern, match) for a localStorage call on one of the storage keys, else None
+
+    Calls are tokenized, so ones inside comments or strings never show up and
+    JSON.stringify arguments may contain parentheses of their own.
+    """
+    key = tstokens.string_value(call.args[0]) if call.args else None
+    if key not in storage_keys:
+        return None
+    if call.callee == 'localStorage.getItem':
+        return patterns[0][0], key
+    if call.callee == 'localStorage.removeItem':
+        return patterns[2][0], key
+    value = tstokens.parse_call(call.args[1]) if len(call.args) == 2 else None
+    if value is not None and value.callee == 'JSON.stringify' and len(value.args) == 1:
+        return patterns[1][0], [key, value.args[0]]
+    return None
+
+def analyze(content):
+    """[(pattern, matches)] for every pattern that matches `content`"""
+    matches = {pattern: [] for pattern, replacement in patterns}
+    calls = {'localStorage.getItem', 'localStorage.setItem', 'localStorage.removeItem'}
+    for call in tstokens.Scan(content).calls(calls):
+        found = match_call(call)
+        if found:
+            matches[found[0]].append(found[1])
+    return [(pattern, found) for pattern, found in matches.items() if found]
+
+def scan(paths, cache=None):
+    """{path: findings}, reading only the files `cache` has no findings for"""
+    results = {}
+    for file_path in paths:
+        findings = cache.get(file_path) if cache else None
+        if findings is None:
+            with open(file_path, 'r') as f:
+                content = f.read()
+            findings = analyze(content)
+            if cache:
+                cache.put(file_path, findings, content.encode('utf-8'))
+        results[file_path] = findings
+    return results
+
+def report(results):
+    for file_path, findings in results.items():
+        print(f"\n📄 {file_path.name}")
+        print("=" * 60)
+
+        for pattern, matches in findings:
             print(f"  Found {len(matches)} matches for pattern: {pattern[:40]}...")
             for match in matches:
-                print(f"    - {match}")
+                print(f"    - {tuple(match) if isinstance(match, list) else match}")
+
+def run_watch(paths, findings, polling=False):
+    """Re-analyze files as they change, keeping every file's findings in memory"""
+    by_name = {str(path): path for path in paths}
+    watcher = watch.open_watcher(paths, polling)
+
+    def on_change(changed):
+        started = time.perf_counter()
+        for name in changed:
+            file_path = by_name[name]
+            try:
+                with open(file_path, 'r') as f:
+                    findings[file_path] = analyze(f.read())
+            except FileNotFoundError:
+                findings[file_path] = []
+        elapsed = (time.perf_counter() - started) * 1000
+        if sys.stdout.isatty():
+            print("\033[2J\033[H", end='')
+        report(findings)
+        total = sum(len(matches) for file_findings in findings.values() for pattern, matches in file_findings)
+        print(f"\n🔄 {', '.join(sorted(by_name[name].name for name in changed))} re-analyzed in {elapsed:.1f} ms"
+              f" - {total} call(s) left in {len(findings)} file(s)")
+
+    print(f"\n👀 Watching {len(paths)} file(s) ({watcher.name}); Ctrl-C to stop")
+    watch.watch(watcher, on_change)
+
+def verify(verifier, paths, cache=None):
+    """Every isolation.Violation in `paths`, reusing cached results for unchanged files"""
+    violations = []
+    for file_path in paths:
+        found = cache.get(file_path) if cache else None
+        if found is None:
+            with open(file_path, 'r') as f:
+                content = f.read()
+            found = verifier.check(content, file_path.relative_to(workspace_root).as_posix())
+            if cache:
+                cache.put(file_path, found, content.encode('utf-8'))
+        violations += [isolation.Violation(*violation) for violation in found]
+    return violations
+
+def run_verify(args):
+    try:
+        rules_text = Path(args.rules).read_text()
+        verifier = isolation.Verifier(*isolation.parse_rules(rules_text, Path(args.rules).name))
+    except (OSError, isolation.RuleError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    # A matcher that misses a seeded leak would report OK on a real one
+    missed = verifier.missed_seeds()
+    for line, source in missed:
+        print(f"❌ {Path(args.rules).name}:{line}: seeded leak not detected: {source}", file=sys.stderr)
+    if missed:
+        sys.exit(2)
+
+    paths = [path for path in discover_files([workspace_root / 'client/src'])
+             if verifier.applies(path.relative_to(workspace_root).as_posix())]
+    if args.no_cache:
+        violations = verify(verifier, paths)
+    else:
+        with FileCache('verify-isolation', fingerprint(rules_text, isolation, tstokens)) as cache:
+            violations = verify(verifier, paths, cache)
+
+    if args.json:
+        print(json.dumps({
+            'ok': not violations,
+            'rules': str(args.rules),
+            'files': len(paths),
+            'violations': [violation._asdict() for violation in violations],
+        }, indent=2))
+    elif not violations:
+        print(f"✅ VERIFICATION COMPLETE: NO DATA LEAKS FOUND ({len(paths)} files)")
+        print("All user data properly uses userDataStorage with userId-based isolation")
+    else:
+        print("⚠️ FOUND REMAINING LEAKS:")
+        for violation in violations:
+            print(f"  {violation.path}:{violation.line}:{violation.column}: "
+                  f"{violation.call}('{violation.key}')  [rule line {violation.rule}]")
+    sys.exit(1 if violations else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find localStorage calls to move to userDataStorage")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="rescan every file instead of reusing findings for unchanged ones")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and re-analyze files as they change")
+    parser.add_argument('--poll', action='store_true', help="with --watch, poll mtimes instead of using inotify")
+    parser.add_argument('--verify', action='store_true',
+                        help="check client/src against the isolation rules; exit 1 on any violation")
+    parser.add_argument('--rules', default=str(isolation.RULES_PATH),
+                        help="rules file for --verify (default: fixes/isolation.rules)")
+    parser.add_argument('--json', action='store_true', help="with --verify, print the result as JSON")
+    args = parser.parse_args()
+
+    if args.verify:
+        run_verify(args)
+
+    paths = []
+    for file_name in files_to_update:
+        file_path = client_src / file_name
+        if not file_path.exists():
+            print(f"❌ File not found: {file_path}")
+            continue
+        paths.append(file_path)
+
+    if args.no_cache:
+        results = scan(paths)
+        report(results)
+    else:
+        rules = fingerprint(patterns, sorted(storage_keys), match_call, analyze, tstokens)
+        with FileCache('analyze-localstorage', rules) as cache:
+            results = scan(paths, cache)
+            report(results)
+        print(f"\n🗂️  {cache.summary()}")
+
+    if args.watch:
+        run_watch(paths, results, args.poll)
+        return
+
+    print("\n✅ Analysis complete!")
+    print("\nNext steps:")
+    print("1. For each file, add import: import { userDataStorage } from '../../utils/userDataStorage';")
+    print("2. Replace all localStorage.getItem/setItem/removeItem calls")
+    print("3. Update JSON.stringify calls to not be needed with userDataStorage.setData()")
 
-print("\n✅ Analysis complete!")
-print("\nNext steps:")
-print("1. For each file, add import: import { userDataStorage } from '../../utils/userDataStorage';")
-print("2. Replace all localStorage.getItem/setItem/removeItem calls")
-print("3. Update JSON.stringify calls to not be needed with userDataStorage.setData()")
+if __name__ == "__main__":
+    main()
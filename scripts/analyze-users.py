@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Aggregate statistics over user exports (server/get-all-users.js output).
+
+The export is read one record at a time, so memory stays flat however
+large the dump gets: a JSON array (data/all-users.json) or NDJSON, one
+user per line, both work. Budgets and guest counts are summarised in fixed
+histogram buckets rather than by keeping every value.
+
+Usage:
+  python scripts/analyze-users.py                       # data/all-users.json
+  python scripts/analyze-users.py server/all-users.json --json
+  mongoexport ... | python scripts/analyze-users.py -   # NDJSON on stdin
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+DEFAULT_EXPORT = Path(__file__).resolve().parents[1] / 'data/all-users.json'
+
+# Characters read per refill; grows while a single record does not fit
+CHUNK_SIZE = 64 * 1024
+
+# Upper bucket bounds (the last bucket is open-ended)
+BUDGET_BUCKETS = [10_000, 25_000, 50_000, 75_000, 100_000, 150_000, 200_000, 250_000, 500_000, 1_000_000]
+GUEST_BUCKETS = [50, 100, 150, 200, 300, 500, 1000]
+
+WHITESPACE = ' \t\r\n'
+
+def iter_records(f, chunk_size=CHUNK_SIZE):
+    """Yield the values of a top-level JSON array, or of NDJSON / concatenated JSON, one at a time
+
+    Only the record being decoded (plus one chunk) is ever held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill(size):
+        nonlocal buffer, pos, eof
+        chunk = f.read(size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(separators):
+        """Move past whitespace and `separators`; the next significant character, or '' at EOF"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in WHITESPACE + separators:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            fill(chunk_size)
+
+    in_array = skip('') == '['
+    if in_array:
+        pos += 1
+
+    size = chunk_size
+    while True:
+        c = skip(',' if in_array else '')
+        if c == '' or (in_array and c == ']'):
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The record runs past the buffer: read more and retry
+            fill(size)
+            size *= 2
+            continue
+        if end == len(buffer) and not eof and not isinstance(record, (dict, list, str)):
+            # A bare number at the buffer edge may be cut short
+            fill(size)
+            continue
+        size = chunk_size
+        pos = end
+        yield record
+
+class Histogram:
+    """Count, sum, min, max and fixed-bucket counts of a stream of numbers"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        i = next((i for i, bound in enumerate(self.bounds) if value < bound), len(self.bounds))
+        self.buckets[i] += 1
+
+    def labels(self):
+        edges = [0] + self.bounds
+        return [f"{lo:,}-{hi:,}" for lo, hi in zip(edges, self.bounds)] + [f"{self.bounds[-1]:,}+"]
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 2) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'buckets': dict(zip(self.labels(), self.buckets)),
+        }
+
+def number(value):
+    """A budget/guest count as a number, tolerating strings like "50,000"; None if missing"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.replace(',', '').replace('$', '').strip())
+        except ValueError:
+            return None
+    return None
+
+def role_of(user):
+    """The user's role, falling back to the one given during onboarding"""
+    onboarding = user.get('onboardingData') or {}
+    return user.get('role') or onboarding.get('role') or 'unknown'
+
+class UserStats:
+    """Running aggregates over user records"""
+
+    def __init__(self):
+        self.users = 0
+        self.roles = Counter()
+        self.onboarded = Counter()
+        self.budgets = {}
+        self.guests = {}
+        self.priorities = Counter()
+
+    def add(self, user):
+        onboarding = user.get('onboardingData') or {}
+        role = role_of(user)
+        self.users += 1
+        self.roles[role] += 1
+        if user.get('onboardingCompleted'):
+            self.onboarded[role] += 1
+
+        budget = number(onboarding.get('estimatedBudget'))
+        if budget is not None:
+            self.budgets.setdefault(role, Histogram(BUDGET_BUCKETS)).add(budget)
+        guests = number(onboarding.get('guestCount'))
+        if guests is not None:
+            self.guests.setdefault(role, Histogram(GUEST_BUCKETS)).add(guests)
+
+        priorities = onboarding.get('topPriority') or []
+        if isinstance(priorities, str):
+            priorities = [priorities]
+        for priority in priorities:
+            if isinstance(priority, str) and priority.strip():
+                self.priorities[priority.strip()] += 1
+
+    def as_dict(self):
+        return {
+            'users': self.users,
+            'onboarding_rate': round(sum(self.onboarded.values()) / self.users, 4) if self.users else None,
+            'roles': {
+                role: {
+                    'users': count,
+                    'onboarding_rate': round(self.onboarded[role] / count, 4),
+                    'budget': self.budgets[role].as_dict() if role in self.budgets else None,
+                    'guests': self.guests[role].as_dict() if role in self.guests else None,
+                }
+                for role, count in self.roles.most_common()
+            },
+            'top_priorities': dict(self.priorities.most_common()),
+        }
+
+def print_histogram(title, histogram):
+    print(f"    {title}: n={histogram.count}  mean={histogram.total / histogram.count:,.0f}  "
+          f"min={histogram.min:,.0f}  max={histogram.max:,.0f}")
+    widest = max(histogram.buckets)
+    for label, count in zip(histogram.labels(), histogram.buckets):
+        if count:
+            print(f"      {label:>19}  {count:5}  {'█' * max(1, round(20 * count / widest))}")
+
+def report(stats, top=15):
+    print(f"👥 {stats.users} user(s)")
+    if not stats.users:
+        return
+    print(f"✅ Onboarding completed: {sum(stats.onboarded.values()) / stats.users:.1%}")
+
+    for role, count in stats.roles.most_common():
+        print(f"\n📋 {role}: {count} user(s), {stats.onboarded[role] / count:.1%} onboarded")
+        if role in stats.budgets:
+            print_histogram("💰 Budget", stats.budgets[role])
+        if role in stats.guests:
+            print_histogram("🎟️  Guests", stats.guests[role])
+
+    print(f"\n⭐ Top priorities ({len(stats.priorities)} distinct)")
+    for priority, count in stats.priorities.most_common(top):
+        print(f"  {count:5}  {priority}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate statistics over user exports")
+    parser.add_argument('exports', nargs='*', default=[str(DEFAULT_EXPORT)],
+                        help="JSON array or NDJSON exports, '-' for stdin (default: data/all-users.json)")
+    parser.add_argument('--json', action='store_true', help="print the aggregates as JSON")
+    parser.add_argument('--top', type=int, default=15, help="top priorities to list (default: 15)")
+    args = parser.parse_args()
+
+    stats = UserStats()
+    for export in args.exports:
+        f = sys.stdin if export == '-' else open(export, 'r', encoding='utf-8')
+        with f:
+            for record in iter_records(f):
+                if isinstance(record, dict):
+                    stats.add(record)
+
+    if args.json:
+        print(json.dumps(stats.as_dict(), indent=2))
+    else:
+        report(stats, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Vivaha Demo Video Benchmarks
+Measures frames/sec of each building block of create-demo-video.py at
+several resolutions, and saves/compares JSON baselines across commits.
+
+Runs offline on CPU only (ImageMagick is needed for the cold text benchmark).
+
+Usage:
+  python scripts/bench-demo-video.py --save bench/baseline.json
+  python scripts/bench-demo-video.py --compare bench/baseline.json --threshold 0.1
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT = Path(__file__).with_name('create-demo-video.py')
+RESOLUTIONS = [480, 720, 1080]
+BENCHMARKS = ['gradient', 'plate', 'text-rasterize', 'sprite-construct', 'sprite-blend',
+              'composite', 'scene-render']
+
+def load_video_module():
+    """Import create-demo-video.py (its file name is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location('demo_video', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def frames_per_second(run, count, repeat):
+    """Best of `repeat` runs of run(i) for i in range(count), as calls per second"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(count):
+            run(i)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+def run_benchmarks(video, frames, repeat):
+    """frames/sec for every building block at the module's current scale"""
+    size = video.frame_size()
+    start, end = video.COLORS['gradient_start'], video.COLORS['gradient_end']
+    fps = video.FPS
+    results = {}
+
+    graph = video.compile_scene(video.SCENES[0])
+
+    # Uncached gradient, then a whole plate built from scratch: the first
+    # scene with its layers made static, so they are flattened into it too
+    results['gradient'] = frames_per_second(
+        lambda i: video.gradient_frame.__wrapped__(start, end, size), frames, repeat)
+    static = video.compile_scene({**video.SCENES[0], 'layers': [
+        {**layer, 'start': 0, 'animate': False} for layer in video.SCENES[0]['layers']]})
+    def plate(i):
+        video.gradient_frame.cache_clear()
+        video.scene_plate.__wrapped__(static.plate, size)
+
+    results['plate'] = frames_per_second(plate, frames, repeat)
+
+    # ImageMagick round-trip (fresh text every call), then sprites built from the disk cache
+    results['text-rasterize'] = frames_per_second(
+        lambda i: video.render_text(f"Benchmark {time.time_ns()}", 'Arial-Bold',
+                                    round(video.scaled(100)), 'white', 'black', video.scaled(2)),
+        max(1, frames // 10), 1)
+
+    style = video.text_style("Smart Budgeting", fontsize=100, stroke_color='black', stroke_width=2)
+    def construct(i):
+        video.render_text.cache_clear()
+        video.zoom_steps.cache_clear()
+        video.layer_sprites.cache_clear()
+        video.layer_sprites(style, True)
+
+    results['sprite-construct'] = frames_per_second(construct, max(1, frames // 10), repeat)
+
+    # Per-frame cost of blending a text layer through its zoom-in and fade, then settled
+    sprites = video.layer_sprites(style, True)
+    frame = video.scene_plate(graph.plate, size).copy()
+    def blend(i):
+        step = min(i % (2 * fps), len(sprites) - 1)
+        opacity = min(255, round(255 * (i % (2 * fps)) / fps / video.TEXT_FADE_IN))
+        sprite = sprites[step]
+        corner = video.resolve_position('center', sprite.rgb.shape[1::-1], size)
+        video.blend_sprite(frame, sprite, corner, opacity)
+
+    results['sprite-blend'] = frames_per_second(blend, frames, repeat)
+
+    # Whole frames from a fresh compositor, fade-in and layer entrances included
+    compositor = video.SceneCompositor(graph, fades_in=True)
+    scene_frames = int(graph.duration * fps)
+    results['composite'] = frames_per_second(
+        lambda i: compositor.render((i % scene_frames) / fps), frames, repeat)
+
+    # Whole scene through the streaming engine into ffmpeg's null muxer
+    encoding = video.Encoding(fps, 'medium', 'stream')
+    compositor = video.SceneCompositor(graph, fades_in=True)
+    def render_frame(out, t):
+        compositor.render(t, out)
+
+    clock = time.perf_counter()
+    video.stream_to_ffmpeg(render_frame, graph.duration, None, encoding, threads=os.cpu_count() or 1)
+    results['scene-render'] = scene_frames / (time.perf_counter() - clock)
+
+    return {name: round(value, 2) for name, value in results.items()}
+
+def environment():
+    """Where the numbers came from"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT.parent,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import moviepy
+    import numpy
+    return {
+        'commit': commit,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'moviepy': moviepy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def compare(baseline, current, threshold):
+    """Print the change per benchmark; returns the list of regressions beyond threshold"""
+    regressions = []
+    for resolution, results in current.items():
+        print(f"\n📐 {resolution}")
+        for name, value in results.items():
+            before = baseline.get(resolution, {}).get(name)
+            if not before:
+                print(f"  {name:16} {value:10.2f} fps   (new)")
+                continue
+            change = value / before - 1
+            marker = '✅'
+            if change < -threshold:
+                marker = '❌'
+                regressions.append(f"{resolution} {name}: {before:.2f} -> {value:.2f} fps ({change:+.1%})")
+            print(f"  {marker} {name:16} {value:10.2f} fps   {change:+7.1%} vs {before:.2f}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the demo video pipeline")
+    parser.add_argument('--resolution', type=int, action='append', metavar='HEIGHT',
+                        help=f"output height to benchmark; repeatable (default: {RESOLUTIONS})")
+    parser.add_argument('--frames', type=int, default=60, help="frames per measurement")
+    parser.add_argument('--repeat', type=int, default=3, help="take the best of this many runs")
+    parser.add_argument('--save', metavar='JSON', help="write the results as a baseline")
+    parser.add_argument('--compare', metavar='JSON', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="fail --compare when a benchmark slows down by more than this fraction")
+    args = parser.parse_args()
+
+    video = load_video_module()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='vivaha-bench-') as cache_dir:
+        # Start from an empty text cache so runs are comparable
+        video.CACHE_DIR = Path(cache_dir)
+        for height in args.resolution or RESOLUTIONS:
+            print(f"⏱️  Benchmarking {height}p...")
+            video.set_scale(height / video.HEIGHT)
+            results[f'{height}p'] = run_benchmarks(video, args.frames, args.repeat)
+
+    report = {'meta': environment(), 'results': results}
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"📊 Compared with {args.compare} ({baseline['meta'].get('commit') or 'unknown commit'})")
+        regressions = compare(baseline['results'], results, args.threshold)
+    else:
+        regressions = []
+        for resolution, values in results.items():
+            print(f"\n📐 {resolution}")
+            for name, value in values.items():
+                print(f"  {name:16} {value:10.2f} fps")
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline saved: {args.save}")
+
+    if regressions:
+        print("\n❌ Performance regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
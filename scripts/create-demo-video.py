@@ -4,14 +4,93 @@ Vivaha Product Demo Video Generator
 Creates a 30-second promotional video showcasing key features
 """
 
+import argparse
+import bisect
+import hashlib
+import inspect
+import json
+import math
+import os
+import queue
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from moviepy.config import get_setting
 from moviepy.editor import *
 from moviepy.video.tools.segmenting import findObjects
 import numpy as np
+from PIL import Image
+
+try:
+    import yaml
+except ImportError:  # optional: only needed for YAML scene specs
+    yaml = None
 
 # Video settings
 WIDTH, HEIGHT = 1920, 1080
 FPS = 30
 DURATION = 30
+CROSSFADE = 0.3
+ZOOM_DURATION = 0.3
+TEXT_FADE_IN = 0.3
+
+# Render scale applied to the 1920x1080 design coordinates (< 1 in preview mode)
+SCALE = 1.0
+PREVIEW_HEIGHT = 480
+PREVIEW_FPS = 12
+
+# Length of the independently cached chunks of each scene (--incremental)
+SEGMENT_SECONDS = 2
+
+# Frames in flight between compositor and encoder for the streaming engine
+STREAM_QUEUE_DEPTH = 8
+
+# How a clip gets encoded: frame rate, x264 preset, render engine and the
+# streaming engine's frame-buffer ceiling in MB
+Encoding = namedtuple('Encoding', 'fps preset engine max_memory',
+                      defaults=(FPS, 'medium', 'moviepy', None))
+OUTPUT_PATH = "/Users/pratiktanikella/Vivaha_repo/vivaha-demo.mp4"
+
+# Declarative scene definitions (see load_scenes)
+SCENE_SPEC = Path(__file__).with_name('demo-video-scenes.json')
+
+# Defaults for text layers in the scene spec
+TEXT_STYLE_KEYS = ('text', 'fontsize', 'color', 'font', 'stroke_color', 'stroke_width')
+TEXT_DEFAULTS = {'fontsize': 80, 'color': 'white', 'font': 'Arial-Bold', 'stroke_color': None,
+                 'stroke_width': 0, 'position': 'center', 'start': 0, 'animate': True}
+
+# Render graph: layer kinds, and one compiled scene
+STATIC, ENTERING, TIME_VARYING = 'static', 'entering', 'time-varying'
+SceneGraph = namedtuple('SceneGraph', 'duration plate layers')
+
+# Persistent render caches (rasterized text, ...), shared between runs
+CACHE_DIR = Path(os.environ.get('VIVAHA_VIDEO_CACHE', Path.home() / '.cache' / 'vivaha-demo'))
+
+# Number of distinct gradient frames kept in memory (~6 MB each at 1080p)
+GRADIENT_CACHE_SIZE = 8
+
+# Number of flattened scene plates kept in memory (~6 MB each at 1080p); enough
+# for every scene of the default spec, so a full render never rebuilds a plate
+PLATE_CACHE_SIZE = 8
+
+# Number of distinct text styles kept rasterized, pre-scaled and as sprites in
+# memory; the default spec has 23 text layers, and a long-lived render daemon
+# sees new ones with every copy override
+TEXT_CACHE_SIZE = 64
+
+# Size in MB the segment cache is pruned back to, least recently used first
+SEGMENT_CACHE_MB = int(os.environ.get('VIVAHA_SEGMENT_CACHE_MB', 4096))
 
 # Vivaha brand colors
 COLORS = {
@@ -24,198 +103,1054 @@ COLORS = {
     'accent': (59, 130, 246)
 }
 
-def create_gradient_background(duration, color1, color2):
-    """Create a gradient background clip"""
-    def make_frame(t):
-        y = np.linspace(0, 1, HEIGHT)[:, None]
-        gradient = np.zeros((HEIGHT, WIDTH, 3))
-        gradient[:, :, 0] = color1[0] + (color2[0] - color1[0]) * y
-        gradient[:, :, 1] = color1[1] + (color2[1] - color1[1]) * y
-        gradient[:, :, 2] = color1[2] + (color2[2] - color1[2]) * y
-        return gradient.astype('uint8')
-    
-    return VideoClip(make_frame, duration=duration)
+class RenderProfiler:
+    """Opt-in per-scene, per-stage wall time, frame and memory accounting
 
-def create_text_clip(text, fontsize=80, color='white', duration=3, position='center', 
-                     font='Arial-Bold', stroke_color=None, stroke_width=0):
-    """Create an animated text clip with entrance effect"""
-    txt = TextClip(text, fontsize=fontsize, color=color, font=font,
-                   stroke_color=stroke_color, stroke_width=stroke_width)
-    
-    # Scale up animation (zoom in)
-    txt = txt.set_duration(duration).set_position(position)
-    txt = txt.resize(lambda t: min(1.0, 0.5 + 0.5 * t / 0.3))
-    txt = txt.crossfadein(0.3)
-    
-    return txt
+    Disabled, and close to free, unless --profile or --trace is given. Spans
+    are aggregated into a JSON report (times are inclusive of nested stages)
+    and can also be exported as Chrome trace events, which chrome://tracing,
+    Perfetto and speedscope show as a flame graph.
+    """
 
-def create_scene_1():
-    """Scene 1: Hero - Two Cultures, One Celebration"""
-    bg = create_gradient_background(4, COLORS['gradient_start'], COLORS['gradient_end'])
-    
-    # Main text with zoom effect
-    text1 = create_text_clip("Two Cultures", fontsize=120, duration=4, 
-                             position=('center', 350), stroke_color='black', stroke_width=3)
-    text2 = create_text_clip("One Celebration", fontsize=120, duration=4,
-                             position=('center', 500), stroke_color='black', stroke_width=3)
-    
-    # Subtext
-    subtext = create_text_clip("Vivaha", fontsize=90, duration=4,
-                              position=('center', 700), color='white')
-    
-    scene = CompositeVideoClip([bg, text1.set_start(0.2), text2.set_start(0.5), subtext.set_start(1.0)])
-    return scene.set_duration(4)
+    def __init__(self):
+        self.enabled = False
+        self.started = time.time()
+        self.records = []
 
-def create_scene_2():
-    """Scene 2: Dashboard Overview"""
-    bg = ColorClip(size=(WIDTH, HEIGHT), color=COLORS['white'], duration=4)
-    
-    # Dashboard mockup (simplified)
-    title = create_text_clip("One Dashboard", fontsize=100, color='#111827', duration=4,
-                            position=('center', 200))
-    
-    features = [
-        ("📊 Budget Tracking", 400),
-        ("👥 Guest Management", 500),
-        ("💒 Ceremony Planning", 600),
-        ("🎵 Music & Sound", 700),
-    ]
-    
-    feature_clips = []
-    for i, (feature, y_pos) in enumerate(features):
-        clip = create_text_clip(feature, fontsize=60, color='#374151', duration=4,
-                               position=(WIDTH//2 - 300, y_pos))
-        feature_clips.append(clip.set_start(0.3 * (i + 1)))
-    
-    scene = CompositeVideoClip([bg, title.set_start(0.2)] + feature_clips)
-    return scene.set_duration(4)
+    @contextmanager
+    def stage(self, name, scene=None, frames=0):
+        """Time the enclosed block as one span of `name`"""
+        if not self.enabled:
+            yield
+            return
 
-def create_scene_3():
-    """Scene 3: Budget & Split"""
-    bg = create_gradient_background(4, (59, 130, 246), (147, 51, 234))
-    
-    title = create_text_clip("Smart Budgeting", fontsize=100, duration=4,
-                            position=('center', 250), stroke_color='black', stroke_width=2)
-    
-    subtitle = create_text_clip("Split costs fairly", fontsize=70, duration=4,
-                                position=('center', 450))
-    
-    price = create_text_clip("Vivaha Split™", fontsize=80, duration=4,
-                            position=('center', 600), color='#FCD34D')
-    
-    scene = CompositeVideoClip([bg, title.set_start(0.2), subtitle.set_start(0.5), price.set_start(0.8)])
-    return scene.set_duration(4)
+        start, clock = time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - clock, scene, frames, start)
 
-def create_scene_4():
-    """Scene 4: Cultural Planning"""
-    bg = create_gradient_background(4, (236, 72, 153), (239, 68, 68))
-    
-    title = create_text_clip("Honor Both Traditions", fontsize=90, duration=4,
-                            position=('center', 300), stroke_color='black', stroke_width=2)
-    
-    features = [
-        "🕉️ Multi-faith ceremonies",
-        "📿 Custom rituals",
-        "🌍 Cultural guidance"
-    ]
-    
-    feature_clips = []
-    for i, feature in enumerate(features):
-        clip = create_text_clip(feature, fontsize=65, duration=4,
-                               position=('center', 500 + i * 100))
-        feature_clips.append(clip.set_start(0.3 * (i + 1)))
-    
-    scene = CompositeVideoClip([bg, title.set_start(0.2)] + feature_clips)
-    return scene.set_duration(4)
+    def add(self, name, seconds, scene=None, frames=0, start=None):
+        """Record a span measured elsewhere"""
+        if self.enabled:
+            start = time.time() - seconds if start is None else start
+            self.records.append((name, scene, start, seconds, frames, peak_rss_mb(),
+                                 os.getpid(), threading.get_ident()))
 
-def create_scene_5():
-    """Scene 5: VivahaPost Community"""
-    bg = ColorClip(size=(WIDTH, HEIGHT), color=(249, 250, 251), duration=4)
-    
-    title = create_text_clip("VivahaPost", fontsize=110, color='#9333EA', duration=4,
-                            position=('center', 250))
-    
-    subtitle = create_text_clip("Real couples, real stories", fontsize=70, color='#6B7280', duration=4,
-                                position=('center', 450))
-    
-    stats = create_text_clip("💕 Share your journey", fontsize=60, color='#EC4899', duration=4,
-                            position=('center', 650))
-    
-    scene = CompositeVideoClip([bg, title.set_start(0.2), subtitle.set_start(0.5), stats.set_start(0.8)])
-    return scene.set_duration(4)
+    def total(self, name):
+        return sum(record[3] for record in self.records if record[0] == name)
 
-def create_scene_6():
-    """Scene 6: Share Everything"""
-    bg = create_gradient_background(4, (16, 185, 129), (5, 150, 105))
-    
-    title = create_text_clip("One Shareable Link", fontsize=100, duration=4,
-                            position=('center', 350), stroke_color='black', stroke_width=2)
-    
-    subtitle = create_text_clip("Auto-updates for everyone", fontsize=70, duration=4,
-                                position=('center', 500))
-    
-    scene = CompositeVideoClip([bg, title.set_start(0.2), subtitle.set_start(0.6)])
-    return scene.set_duration(4)
+    def instrument(self, clip, scene_of):
+        """Wrap a clip so every frame it produces is timed as 'composite' for scene_of(t)"""
+        if not self.enabled:
+            return clip
 
-def create_scene_7():
-    """Scene 7: CTA"""
-    bg = create_gradient_background(6, COLORS['gradient_start'], COLORS['gradient_end'])
-    
-    logo = create_text_clip("Vivaha", fontsize=140, duration=6,
-                           position=('center', 350), stroke_color='black', stroke_width=4)
-    
-    tagline = create_text_clip("Plan your perfect celebration", fontsize=70, duration=6,
-                               position=('center', 550))
-    
-    cta = create_text_clip("vivahaplan.com", fontsize=80, duration=6,
-                          position=('center', 700), color='#FCD34D')
-    
-    scene = CompositeVideoClip([bg, logo.set_start(0.3), tagline.set_start(0.7), cta.set_start(1.2)])
-    return scene.set_duration(6)
+        def timed(get_frame, t):
+            with self.stage('composite', scene_of(t), frames=1):
+                return get_frame(t)
 
-def create_demo_video():
-    """Compile all scenes into final video"""
-    print("🎬 Creating Vivaha demo video...")
-    
-    scenes = [
-        create_scene_1(),
-        create_scene_2(),
-        create_scene_3(),
-        create_scene_4(),
-        create_scene_5(),
-        create_scene_6(),
-        create_scene_7()
-    ]
-    
-    # Concatenate scenes with crossfade transitions
-    final_clips = []
-    for i, scene in enumerate(scenes):
-        if i > 0:
-            scene = scene.crossfadein(0.3)
-        final_clips.append(scene)
-    
-    final_video = concatenate_videoclips(final_clips, method="compose")
+        return clip.fl(timed)
+
+    def instrument_render(self, render_into, scene_of):
+        """Wrap render_into(out, t) so every frame it draws is timed as 'composite' for scene_of(t)"""
+        if not self.enabled:
+            return render_into
+
+        def timed(out, t):
+            with self.stage('composite', scene_of(t), frames=1):
+                render_into(out, t)
+
+        return timed
+
+    def drain(self):
+        """Hand this process's records over (pool workers return them to the parent)"""
+        records, self.records = self.records, []
+        return records
+
+    def merge(self, records):
+        self.records.extend(records)
+
+    def report(self):
+        stages, scenes = {}, {}
+        for name, scene, _, seconds, frames, rss, _, _ in self.records:
+            entry = stages.setdefault((name, scene), {'stage': name, 'scene': scene, 'seconds': 0.0,
+                                                      'calls': 0, 'frames': 0, 'peak_rss_mb': 0.0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['frames'] += frames
+            entry['peak_rss_mb'] = max(entry['peak_rss_mb'], rss)
+            if scene is not None:
+                totals = scenes.setdefault(str(scene), {'composite_seconds': 0.0, 'frames': 0,
+                                                        'peak_rss_mb': 0.0})
+                totals['peak_rss_mb'] = max(totals['peak_rss_mb'], rss)
+                if name == 'composite':
+                    totals['composite_seconds'] += seconds
+                    totals['frames'] += frames
+
+        for entry in list(stages.values()) + list(scenes.values()):
+            seconds = entry.get('seconds', entry.get('composite_seconds'))
+            entry['fps'] = round(entry['frames'] / seconds, 2) if entry['frames'] and seconds else None
+
+        return {
+            'wall_seconds': time.time() - self.started,
+            'peak_rss_mb': max(peak_rss_mb(), peak_rss_mb(resource.RUSAGE_CHILDREN)),
+            'stages': sorted(stages.values(), key=lambda entry: -entry['seconds']),
+            'scenes': scenes,
+        }
+
+    def trace(self):
+        return {'displayTimeUnit': 'ms', 'traceEvents': [
+            {'name': name, 'cat': 'render', 'ph': 'X', 'ts': start * 1e6, 'dur': seconds * 1e6,
+             'pid': pid, 'tid': tid, 'args': {'scene': scene, 'frames': frames}}
+            for name, scene, start, seconds, frames, _, pid, tid in self.records
+        ]}
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+PROFILER = RenderProfiler()
+
+def set_scale(scale):
+    """Set the render scale used by the scene builders"""
+    global SCALE
+    SCALE = scale
+
+def frame_size():
+    """Output frame size at the current render scale (even, as libx264 requires)"""
+    return (2 * round(WIDTH * SCALE / 2), 2 * round(HEIGHT * SCALE / 2))
+
+def scaled(value):
+    """Map a design-space value (pixels at 1920x1080) to the render scale"""
+    if isinstance(value, (int, float)):
+        return value * SCALE
+    if isinstance(value, tuple):
+        return tuple(scaled(v) for v in value)
+    return value
+
+@lru_cache(maxsize=GRADIENT_CACHE_SIZE)
+def gradient_frame(color1, color2, size):
+    """Render a vertical gradient once as a shared, read-only uint8 frame"""
+    width, height = size
+    with PROFILER.stage('gradient'):
+        y = np.linspace(0, 1, height)[:, None]
+        start = np.asarray(color1, dtype=np.float64)
+        end = np.asarray(color2, dtype=np.float64)
+        column = (start + (end - start) * y).astype('uint8')
+
+        frame = np.empty((height, width, 3), dtype='uint8')
+        frame[:] = column[:, None, :]
+    frame.setflags(write=False)
+    return frame
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text, font, fontsize, color, stroke_color, stroke_width):
+    """Rasterize text to an RGBA uint8 bitmap, going through ImageMagick only on a cache miss"""
+    key = json.dumps([text, font, fontsize, color, stroke_color, stroke_width])
+    path = CACHE_DIR / 'text' / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.png"
+
+    if path.exists():
+        with PROFILER.stage('text-cache'):
+            rgba = np.asarray(Image.open(path).convert('RGBA'))
+    else:
+        with PROFILER.stage('text-rasterize'):
+            txt = TextClip(text, fontsize=fontsize, color=color, font=font,
+                           stroke_color=stroke_color, stroke_width=stroke_width)
+            alpha = np.round(txt.mask.get_frame(0) * 255).astype('uint8')
+            rgba = np.dstack([txt.get_frame(0).astype('uint8'), alpha])
+
+        # Write next to the final name and rename so concurrent renders never read half a PNG
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        Image.fromarray(rgba, 'RGBA').save(tmp_path, format='PNG')
+        os.replace(tmp_path, path)
+
+    rgba.setflags(write=False)
+    return rgba
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def zoom_steps(text, font, fontsize, color, stroke_color, stroke_width):
+    """Pre-scale the text bitmap for every frame of the zoom-in, ending at full size"""
+    rgba = render_text(text, font, fontsize, color, stroke_color, stroke_width)
+    height, width = rgba.shape[:2]
+    rgb = Image.fromarray(np.ascontiguousarray(rgba[:, :, :3]))
+    alpha = Image.fromarray(np.ascontiguousarray(rgba[:, :, 3]))
+
+    steps = []
+    with PROFILER.stage('text-resize'):
+        for frame in range(int(round(ZOOM_DURATION * FPS))):
+            scale = 0.5 + 0.5 * (frame / FPS) / ZOOM_DURATION
+            size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            steps.append((np.asarray(rgb.resize(size, Image.LANCZOS)),
+                          np.asarray(alpha.resize(size, Image.LANCZOS)) / 255.0))
+    steps.append((rgba[:, :, :3], rgba[:, :, 3] / 255.0))
+    return steps
+
+def text_style(text, fontsize=80, color='white', font='Arial-Bold', stroke_color=None, stroke_width=0):
+    """Arguments for render_text/zoom_steps at the current render scale"""
+    return (text, font, round(scaled(fontsize)), color, stroke_color, scaled(stroke_width))
+
+def load_scenes(path=SCENE_SPEC):
+    """Load the scene list from a JSON (or, with PyYAML installed, YAML) spec"""
+    with open(path, encoding='utf-8') as f:
+        if Path(path).suffix in ('.yaml', '.yml'):
+            if yaml is None:
+                raise RuntimeError("PyYAML is required for YAML scene specs (pip install pyyaml)")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    return spec['scenes']
+
+def set_scenes(scenes):
+    """Replace the scene list used by build_scene (e.g. a localized spec)"""
+    global SCENES
+    SCENES = scenes
+
+def resolve_color(color):
+    """Brand color name or [r, g, b] list -> RGB tuple"""
+    return tuple(COLORS[color]) if isinstance(color, str) else tuple(color)
+
+def resolve_position(position, size, frame):
+    """Top-left corner of a (w, h) layer in a (W, H) frame, using moviepy's position keywords"""
+    if isinstance(position, str):
+        position = (position, position)
+
+    corner = []
+    for value, length, full, (low, high) in zip(position, size, frame, [('left', 'right'), ('top', 'bottom')]):
+        if value == 'center':
+            corner.append(int((full - length) / 2))
+        elif value == low:
+            corner.append(0)
+        elif value == high:
+            corner.append(full - length)
+        else:
+            corner.append(int(value))
+    return tuple(corner)
+
+def blend_onto(frame, rgba, corner):
+    """Alpha-blend an RGBA bitmap onto a uint8 frame in place, clipped to the frame"""
+    x, y = corner
+    height, width = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + rgba.shape[1], width), min(y + rgba.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    src = rgba[y0 - y:y1 - y, x0 - x:x1 - x]
+    alpha = src[:, :, 3:] / 255.0
+    region = frame[y0:y1, x0:x1]
+    region[:] = alpha * src[:, :, :3] + (1 - alpha) * region
+
+def expand_lists(layers):
+    """Expand `list` layers into one text layer per item, stepping down and staggering in"""
+    for spec in layers:
+        if 'list' not in spec:
+            yield spec
+            continue
+
+        base = {k: v for k, v in spec.items() if k not in ('list', 'step', 'stagger')}
+        x, y = spec['position']
+        for i, item in enumerate(spec['list']):
+            yield dict(base, text=item, position=[x, y + i * spec.get('step', 100)],
+                       start=spec.get('start', 0) + i * spec.get('stagger', 0))
+
+def apply_variant(scenes, slots):
+    """Copy of the scene specs with the named layer slots overridden (text, or items of a list)"""
+    scenes = json.loads(json.dumps(scenes))
+    unused = set(slots)
+    for scene in scenes:
+        for layer in scene.get('layers', []):
+            slot = layer.get('slot')
+            if slot in slots:
+                layer['list' if 'list' in layer else 'text'] = slots[slot]
+                unused.discard(slot)
+
+    if unused:
+        raise ValueError(f"Unknown scene slots: {', '.join(sorted(unused))}")
+    return scenes
+
+def compile_scene(scene):
+    """Compile a scene spec into a render graph
+
+    Every layer is classified as STATIC (on screen for the whole scene, never
+    animated), ENTERING (zoom/fade entrance, then holds) or TIME_VARYING
+    (pops in or out mid-scene). The background and the run of static layers
+    directly above it are flattened into one cached plate; only the rest is
+    composited per frame.
+    """
+    duration = scene['duration']
+    layers = []
+    for spec in expand_lists(scene.get('layers', [])):
+        layer = {**TEXT_DEFAULTS, 'end': duration, **spec}
+        if isinstance(layer['position'], list):
+            layer['position'] = tuple(layer['position'])
+
+        if layer['animate']:
+            kind = ENTERING
+        elif layer['start'] > 0 or layer['end'] < duration:
+            kind = TIME_VARYING
+        else:
+            kind = STATIC
+        layers.append((kind, layer))
+
+    flat = 0
+    while flat < len(layers) and layers[flat][0] == STATIC:
+        flat += 1
+
+    plate = json.dumps({'background': scene['background'],
+                        'layers': [layer for _, layer in layers[:flat]]}, sort_keys=True)
+    return SceneGraph(duration, plate, layers[flat:])
+
+@lru_cache(maxsize=PLATE_CACHE_SIZE)
+def scene_plate(plate, size):
+    """Flatten a scene's background and static layers into one read-only uint8 frame"""
+    spec = json.loads(plate)
+    background = spec['background']
+    with PROFILER.stage('plate'):
+        if 'gradient' in background:
+            frame = gradient_frame(*map(resolve_color, background['gradient']), size)
+        else:
+            frame = np.empty((size[1], size[0], 3), dtype='uint8')
+            frame[:] = resolve_color(background['color'])
+
+        if spec['layers']:
+            frame = frame.copy()
+            for layer in spec['layers']:
+                rgba = render_text(*text_style(**{k: layer[k] for k in TEXT_STYLE_KEYS}))
+                position = scaled(tuple(layer['position']) if isinstance(layer['position'], list)
+                                  else layer['position'])
+                blend_onto(frame, rgba, resolve_position(position, rgba.shape[1::-1], size))
+
+    frame.setflags(write=False)
+    return frame
+
+# A text bitmap prepared for fixed-point blending: uint16 rgb, alpha (0-255),
+# rgb * alpha and 255 - alpha, all read-only
+Sprite = namedtuple('Sprite', 'rgb alpha premultiplied inverse')
+
+def make_sprite(rgb, alpha):
+    """Sprite from a uint8 (h, w, 3) bitmap and its uint8 (h, w) alpha"""
+    rgb = rgb.astype('uint16')
+    alpha = alpha.astype('uint16')[:, :, None]
+    sprite = Sprite(rgb, alpha, rgb * alpha, 255 - alpha)
+    for array in sprite:
+        array.setflags(write=False)
+    return sprite
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def layer_sprites(style, animate):
+    """Sprites of a text layer: one per zoom step when it animates, else just the full-size bitmap"""
+    if not animate:
+        rgba = render_text(*style)
+        return [make_sprite(rgba[:, :, :3], rgba[:, :, 3])]
+    return [make_sprite(rgb, np.round(alpha * 255)) for rgb, alpha in zoom_steps(*style)]
+
+def div255(x):
+    """Round a uint16 array of values <= 255 * 255 to x / 255, in place"""
+    x += 128
+    x += x >> 8
+    x >>= 8
+    return x
+
+def blend_sprite(frame, sprite, corner, opacity=255):
+    """Blend a sprite onto a uint8 frame in place at `opacity` (0-255), clipped to the frame
+
+    Returns the (x0, y0, x1, y1) rectangle it touched, or None.
+    """
+    x, y = corner
+    height, width = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + sprite.rgb.shape[1], width), min(y + sprite.rgb.shape[0], height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    src = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    region = frame[y0:y1, x0:x1]
+    if opacity == 255:
+        mix = region * sprite.inverse[src]
+        mix += sprite.premultiplied[src]
+    else:
+        alpha = div255(sprite.alpha[src] * np.uint16(opacity))
+        mix = sprite.rgb[src] * alpha
+        mix += region * (255 - alpha)
+    region[:] = div255(mix)
+    return x0, y0, x1, y1
+
+class SceneCompositor:
+    """Render a compiled scene into one reused uint8 frame, redrawing only what changed
+
+    The frame starts as a copy of the scene plate. Each layer is a sprite
+    blended in uint16 fixed point with premultiplied alpha, only over its
+    own bounding box. When the set of sprites, positions or opacities
+    differs from the previous frame, the rectangles drawn last time are
+    restored from the plate and the layers are blended again; otherwise
+    the frame is returned untouched. The scene fade-in over black (the
+    only whole-frame operation) goes through a separate buffer.
+
+    render() can also draw into a caller's buffer (the streaming engine's
+    frame pool); each buffer remembers what was blended into it last, so
+    it gets the same rectangle-only updates as the compositor's own frame.
+    """
+
+    def __init__(self, graph, fades_in=False, size=None):
+        self.duration = graph.duration
+        self.fades_in = fades_in
+        self.size = size or frame_size()
+        self.plate = scene_plate(graph.plate, self.size)
+        self.frame = self.plate.copy()
+        self.faded = None
+        # id(buffer) -> (weak reference to it, [(operation, rect) blended into it])
+        self.drawn = {id(self.frame): (weakref.ref(self.frame), [])}
+        self.layers = []
+        for kind, layer in graph.layers:
+            style = text_style(**{k: layer[k] for k in TEXT_STYLE_KEYS})
+            self.layers.append((layer['start'], layer['end'], kind == ENTERING,
+                                layer_sprites(style, kind == ENTERING), scaled(layer['position'])))
+
+    def operations(self, t):
+        """(layer, sprite step, corner, opacity) of every layer visible at `t`, bottom to top"""
+        operations = []
+        for i, (start, end, entering, sprites, position) in enumerate(self.layers):
+            if not start <= t < end:
+                continue
+            step, opacity = len(sprites) - 1, 255
+            if entering:
+                # Zoom steps at the design FPS, then a linear fade
+                step = min(int(round((t - start) * FPS)), step)
+                if t - start < TEXT_FADE_IN:
+                    opacity = int(round(255 * (t - start) / TEXT_FADE_IN))
+            corner = resolve_position(position, sprites[step].rgb.shape[1::-1], self.size)
+            operations.append((i, step, corner, opacity))
+        return operations
+
+    def compose(self, buffer, operations):
+        """Bring `buffer` from what was last blended into it to `operations`"""
+        ref, drawn = self.drawn.get(id(buffer), (None, None))
+        if ref is None or ref() is not buffer:
+            # A buffer this compositor has not drawn into yet (or a new one under a recycled id)
+            self.drawn = {key: entry for key, entry in self.drawn.items() if entry[0]() is not None}
+            buffer[:] = self.plate
+            drawn = []
+
+        if operations != [operation for operation, _ in drawn]:
+            for _, (x0, y0, x1, y1) in drawn:
+                buffer[y0:y1, x0:x1] = self.plate[y0:y1, x0:x1]
+            drawn = []
+            for operation in operations:
+                i, step, corner, opacity = operation
+                rect = blend_sprite(buffer, self.layers[i][3][step], corner, opacity)
+                if rect is not None:
+                    drawn.append((operation, rect))
+        self.drawn[id(buffer)] = (weakref.ref(buffer), drawn)
+
+    def render(self, t, out=None):
+        """The frame at `t`
+
+        Without `out` the returned buffer is the compositor's own, reused by
+        the next call. With `out` (a uint8 frame that nothing else writes to
+        between calls) the frame is drawn into it and it is returned.
+        """
+        operations = self.operations(t)
+        if not self.fades_in or t >= CROSSFADE:
+            target = self.frame if out is None else out
+            self.compose(target, operations)
+            return target
+
+        self.compose(self.frame, operations)
+        if self.faded is None:
+            self.faded = np.empty(self.frame.shape, dtype='uint16')
+        np.multiply(self.frame, np.uint16(round(255 * t / CROSSFADE)), out=self.faded)
+        if out is None:
+            return div255(self.faded).astype('uint8')
+        # `out` now holds a faded picture, not the plate plus what it drew
+        self.drawn.pop(id(out), None)
+        np.copyto(out, div255(self.faded), casting='unsafe')
+        return out
+
+    def clip(self):
+        return VideoClip(self.render, duration=self.duration)
+
+def settled_intervals(graph, fades_in=False):
+    """(start, end) spans of a scene, in seconds, over which every frame is identical
+
+    A scene only changes while it fades in, while an ENTERING layer zooms
+    and fades, and at the instants a layer appears or disappears; between
+    those points (usually from ~1.5s to the end) it holds one picture.
+    """
+    animated = [(0, CROSSFADE)] if fades_in else []
+    cuts = {0, graph.duration}
+    for kind, layer in graph.layers:
+        if kind == ENTERING:
+            animated.append((layer['start'], layer['start'] + max(ZOOM_DURATION, TEXT_FADE_IN)))
+        cuts.update((layer['start'], layer['end']))
+    for span in animated:
+        cuts.update(span)
+
+    cuts = sorted(cut for cut in cuts if 0 <= cut <= graph.duration)
+    return [(a, b) for a, b in zip(cuts, cuts[1:])
+            if not any(start < b and a < end for start, end in animated)]
+
+def hold_runs(holds, fps, frames):
+    """Frame ranges [first, end) inside the `holds` spans, each with the frame that stands for it
+
+    Only frames strictly inside a span are held, so the boundary frames
+    (where float timing may still be a hair short of the settled picture)
+    are composited as usual.
+    """
+    runs = []
+    for start, end in holds:
+        # The epsilon keeps 0.7 * 30 = 20.999... from counting as frame 20
+        first, last = math.floor(start * fps + 1e-6) + 1, min(math.ceil(end * fps - 1e-6), frames)
+        if last - first >= 2:
+            runs.append((first, last, (first + last) // 2))
+    return runs
+
+def shift_holds(holds, offset, duration):
+    """`holds` moved by -offset and clipped to [0, duration] (for a subclip)"""
+    return [(max(start - offset, 0), min(end - offset, duration)) for start, end in holds
+            if end - offset > 0 and start - offset < duration]
+
+def hold_frames(clip, holds, fps):
+    """Wrap a clip so each held run is composited once and served from that frame"""
+    runs = hold_runs(holds, fps, int(clip.duration * fps))
+    if not runs:
+        return clip
+    firsts = [first for first, _, _ in runs]
+    held = {}
+
+    def frame(get_frame, t):
+        index = int(round(t * fps))
+        i = bisect.bisect_right(firsts, index) - 1
+        if i < 0 or index >= runs[i][1]:
+            return get_frame(t)
+        if i not in held:
+            # Runs are visited in order: keep only the current one (a copy,
+            # since a compositor reuses its frame buffer)
+            held.clear()
+            held[i] = get_frame(runs[i][2] / fps).copy()
+        return held[i]
+
+    return clip.fl(frame)
+
+SCENES = load_scenes()
+
+def scene_compositor(index, spec=None):
+    """SceneCompositor of scene `index` (or `spec` in its place) as it appears in the timeline, fading in from black"""
+    with PROFILER.stage('build', index + 1):
+        return SceneCompositor(compile_scene(SCENES[index] if spec is None else spec), fades_in=index > 0)
+
+def build_scene(index, spec=None):
+    """Build scene `index` (or `spec` in its place) as an opaque clip drawn by its SceneCompositor"""
+    return scene_compositor(index, spec).clip()
+
+def scene_holds(index, spec=None):
+    """settled_intervals of scene `index` (or `spec` in its place) as build_scene builds it"""
+    return settled_intervals(compile_scene(SCENES[index] if spec is None else spec), fades_in=index > 0)
+
+def _init_worker(scale, scenes, profile=False):
+    """Process pool initializer: carry the parent's render settings over"""
+    set_scale(scale)
+    set_scenes(scenes)
+    PROFILER.enabled = profile
+
+def _render_scene_file(index, path, threads, encoding):
+    """Render one scene, with its fade-in from the previous one, to its own file"""
+    compositor = scene_compositor(index)
+    scene = compositor.clip()
+    write_clip(scene, path, encoding, threads=threads, logger=None, scene=index + 1,
+               holds=scene_holds(index), render_into=lambda out, t: compositor.render(t, out))
+    return scene.duration, PROFILER.drain()
+
+def _render_segment_file(index, spec, start_frame, end_frame, path, threads, encoding):
+    """Render frames [start_frame, end_frame) of one timeline scene into the segment cache"""
+    compositor = scene_compositor(index, spec)
+    offset = start_frame / encoding.fps
+    segment = compositor.clip().subclip(offset, end_frame / encoding.fps)
+    holds = shift_holds(scene_holds(index, spec), offset, segment.duration)
+
+    # Only a fully encoded segment ever appears under its final name, so an
+    # interrupted render resumes from the last finished segment
+    tmp_path = f'{path}.{os.getpid()}.tmp.mp4'
+    write_clip(segment, tmp_path, encoding, threads=threads, logger=None, scene=index + 1, holds=holds,
+               render_into=lambda out, t: compositor.render(t + offset, out))
+    os.replace(tmp_path, path)
+    return PROFILER.drain()
+
+def stream_to_ffmpeg(render_frame, duration, output_path, encoding, threads=4, scene=None, holds=()):
+    """Encode frames produced by render_frame(out, t) through a raw ffmpeg stdin pipe
+
+    Each frame is composited into one of a few preallocated uint8 buffers and
+    handed to a writer thread, which pushes it to ffmpeg without copying. The
+    bounded buffer pool lets compositing and encoding overlap while capping
+    memory at depth * frame size. Within the `holds` spans (see
+    settled_intervals) a frame is composited once and the writer sends the
+    same buffer for the whole run. With output_path=None the encoded stream
+    goes to ffmpeg's null muxer (benchmarks).
+    """
+    width, height = frame_size()
+    frame_bytes = width * height * 3
+    depth = STREAM_QUEUE_DEPTH
+    if encoding.max_memory:
+        depth = max(1, min(depth, encoding.max_memory * 1024 * 1024 // frame_bytes))
+
+    process = subprocess.Popen([
+        get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-vcodec', 'rawvideo', '-pix_fmt', 'rgb24',
+        '-s', f'{width}x{height}', '-r', str(encoding.fps), '-i', '-',
+        '-an', '-c:v', 'libx264', '-preset', encoding.preset, '-pix_fmt', 'yuv420p',
+        '-threads', str(threads),
+        *(['-f', 'null', '-'] if output_path is None else ['-movflags', '+faststart', output_path])
+    ], stdin=subprocess.PIPE)
+
+    buffers = [np.empty((height, width, 3), dtype='uint8') for _ in range(depth)]
+    free, filled = queue.Queue(), queue.Queue()
+    for index in range(depth):
+        free.put(index)
+    errors = []
+
+    def writer():
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            index, repeat = item
+            if not errors:
+                try:
+                    with PROFILER.stage('encode', scene, frames=repeat):
+                        for _ in range(repeat):
+                            process.stdin.write(memoryview(buffers[index]))
+                except OSError as error:
+                    # Keep draining so the compositor never blocks on a dead encoder
+                    errors.append(error)
+            free.put(index)
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    frames = int(duration * encoding.fps)
+    runs = {first: (end, held) for first, end, held in hold_runs(holds, encoding.fps, frames)}
+    try:
+        frame = 0
+        while frame < frames and not errors:
+            index = free.get()
+            end, held = runs.get(frame, (frame + 1, frame))
+            render_frame(buffers[index], held / encoding.fps)
+            filled.put((index, end - frame))
+            frame = end
+    finally:
+        filled.put(None)
+        thread.join()
+        with PROFILER.stage('encode', scene):
+            try:
+                process.stdin.close()
+            except BrokenPipeError:  # ffmpeg already exited; its exit code says why
+                pass
+            returncode = process.wait()
+
+    if errors or returncode != 0:
+        raise IOError(f"ffmpeg failed to encode {output_path} (exit code {returncode})")
+
+def write_clip(clip, path, encoding, threads=4, logger='bar', scene=None, scene_of=None, holds=(),
+               render_into=None):
+    """Encode a clip with the selected engine
+
+    For profiling, frames are attributed to scene_of(t), or to `scene`.
+    Frames inside the `holds` spans are composited once per span. The
+    streaming engine draws frames with render_into(out, t) when given (the
+    clip's compositors rendering straight into its buffers) instead of
+    copying clip.get_frame(t).
+    """
+    scene_of = scene_of or (lambda t: scene)
+
+    if encoding.engine == 'stream':
+        if render_into is None:
+            clip = PROFILER.instrument(clip, scene_of)
+            def render_frame(out, t):
+                np.copyto(out, clip.get_frame(t), casting='unsafe')
+        else:
+            render_frame = PROFILER.instrument_render(render_into, scene_of)
+
+        stream_to_ffmpeg(render_frame, clip.duration, path, encoding, threads, scene, holds)
+        return
+
+    clip = hold_frames(PROFILER.instrument(clip, scene_of), holds, encoding.fps)
+
+    # moviepy composites and encodes in one loop: encode time is what the
+    # write took beyond compositing
+    composite_before, clock = PROFILER.total('composite'), time.perf_counter()
+    clip.write_videofile(
+        path,
+        fps=encoding.fps,
+        codec='libx264',
+        audio_codec='aac',
+        temp_audiofile='temp-audio.m4a',
+        remove_temp=True,
+        preset=encoding.preset,
+        threads=threads,
+        logger=logger
+    )
+    composite = PROFILER.total('composite') - composite_before
+    PROFILER.add('encode', time.perf_counter() - clock - composite, scene,
+                 frames=int(clip.duration * encoding.fps))
+
+def concat_videos(paths, output_path):
+    """Join identically encoded files with ffmpeg's concat demuxer (no re-encode)"""
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as listing:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+
+    try:
+        with PROFILER.stage('concat'):
+            subprocess.run([
+                get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+                '-f', 'concat', '-safe', '0', '-i', listing.name,
+                '-c', 'copy', '-movflags', '+faststart', output_path
+            ], check=True)
+    finally:
+        os.remove(listing.name)
+
+def render_scenes_parallel(output_path, scenes, encoding, workers=None):
+    """Render the given scenes in a process pool, then concatenate them losslessly"""
+    cpus = os.cpu_count() or 1
+    workers = min(workers or cpus, len(scenes))
+    threads = max(1, cpus // workers)
+    count = len(scenes)
+
+    print(f"💾 Rendering {count} scenes on {workers} workers...")
+    with tempfile.TemporaryDirectory(prefix='vivaha-scenes-') as tmp_dir:
+        paths = [os.path.join(tmp_dir, f'scene-{i + 1}.mp4') for i in scenes]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(SCALE, SCENES, PROFILER.enabled)) as pool:
+            results = list(pool.map(_render_scene_file, scenes, paths, [threads] * count,
+                                    [encoding] * count))
+        durations = []
+        for duration, records in results:
+            durations.append(duration)
+            PROFILER.merge(records)
+
+        print("🔗 Joining scenes...")
+        concat_videos(paths, output_path)
+
+    return sum(durations)
+
+def render_timeline(output_path, scenes, encoding):
+    """Render the given scenes in a single pass"""
+    # Scenes fade in from black and are opaque, so they are chained rather
+    # than composited over each other
+    compositors = [scene_compositor(i) for i in scenes]
+    final_video = concatenate_videoclips([compositor.clip() for compositor in compositors], method="chain")
     
     # Add background music (if available)
     # audio = AudioFileClip("background_music.mp3").set_duration(final_video.duration)
     # final_video = final_video.set_audio(audio)
     
+    starts = list(final_video.start_times)
+    holds = [(start + a, start + b) for index, start in zip(scenes, starts) for a, b in scene_holds(index)]
+    def render_into(out, t):
+        i = bisect.bisect_right(starts, t) - 1
+        compositors[i].render(t - starts[i], out)
+
     print("💾 Rendering video...")
-    output_path = "/Users/pratiktanikella/Vivaha_repo/vivaha-demo.mp4"
-    final_video.write_videofile(
-        output_path,
-        fps=FPS,
-        codec='libx264',
-        audio_codec='aac',
-        temp_audiofile='temp-audio.m4a',
-        remove_temp=True,
-        preset='medium',
-        threads=4
-    )
+    write_clip(final_video, output_path, encoding, holds=holds, render_into=render_into,
+               scene_of=lambda t: scenes[bisect.bisect_right(starts, t) - 1] + 1)
     
+    return final_video.duration
+
+@lru_cache(maxsize=None)
+def _helpers_digest():
+    """Hash of the source of every helper that compiles, renders and encodes a scene spec"""
+    helpers = [gradient_frame, text_style, zoom_steps, render_text, scaled, resolve_color,
+               resolve_position, blend_onto, expand_lists, compile_scene, scene_plate, make_sprite,
+               layer_sprites, div255, blend_sprite, SceneCompositor, scene_compositor, build_scene,
+               settled_intervals, hold_runs, shift_holds, hold_frames, scene_holds,
+               stream_to_ffmpeg, write_clip, _render_segment_file]
+    sources = ''.join(inspect.getsource(helper) for helper in helpers)
+    return hashlib.sha256(sources.encode('utf-8')).hexdigest()
+
+def scene_fingerprint(index, spec):
+    """Hash everything that determines how `spec`, placed as scene `index`, looks in the timeline
+
+    Covers the scene's spec (texts, colors, timings), the source of the
+    helpers that compile, render and encode it (hold detection and ffmpeg
+    flags included), the brand colors, the text defaults and timings and
+    the output geometry.
+    """
+    definition = {
+        'scene': spec,
+        'helpers': _helpers_digest(),
+        'colors': COLORS,
+        'design': [WIDTH, HEIGHT, FPS, CROSSFADE, ZOOM_DURATION, TEXT_FADE_IN],
+        'text': [TEXT_DEFAULTS, TEXT_STYLE_KEYS],
+        'frame_size': frame_size(),
+        'fades_in': index > 0,
+    }
+    return hashlib.sha256(json.dumps(definition, sort_keys=True).encode('utf-8')).hexdigest()
+
+def plan_segments(scenes, encoding, specs=None):
+    """Split each scene into SEGMENT_SECONDS chunks keyed by content hash"""
+    specs = SCENES if specs is None else specs
+    segment_frames = max(1, round(SEGMENT_SECONDS * encoding.fps))
+    segments = []
+    for index in scenes:
+        fingerprint = scene_fingerprint(index, specs[index])
+        total_frames = int(specs[index]['duration'] * encoding.fps)
+        for start in range(0, total_frames, segment_frames):
+            end = min(start + segment_frames, total_frames)
+            key = json.dumps([fingerprint, encoding.fps, encoding.preset, encoding.engine, start, end])
+            name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+            segments.append((index, specs[index], start, end, CACHE_DIR / 'segments' / f'{name}.mp4'))
+    return segments
+
+def touch_segments(segments):
+    """Mark the cached ones among `segments` as just used (see prune_segments); returns the missing ones"""
+    missing = []
+    for segment in segments:
+        try:
+            os.utime(segment[-1])
+        except FileNotFoundError:
+            missing.append(segment)
+    return missing
+
+def prune_segments(limit_mb=SEGMENT_CACHE_MB, keep=()):
+    """Shrink the segment cache to `limit_mb`, least recently used first; returns how many files went
+
+    Segments in `keep` stay, and so do the temp files of renders still
+    running; those left by a dead process are removed.
+    """
+    entries, removed = [], 0
+    for path in (CACHE_DIR / 'segments').glob('*.mp4'):
+        try:
+            if path.name.endswith('.tmp.mp4'):
+                # <name>.mp4.<pid>.tmp.mp4, see _render_segment_file
+                os.kill(int(path.name.split('.')[-3]), 0)
+                continue
+            stat = path.stat()
+        except (ProcessLookupError, ValueError):
+            path.unlink(missing_ok=True)
+            removed += 1
+            continue
+        except (FileNotFoundError, PermissionError):
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit_mb * 1024 * 1024:
+            break
+        if path not in keep:
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+    return removed
+
+def render_segments(segments, encoding, workers=1):
+    """Render the segments that are not in the cache yet; returns how many were rendered"""
+    missing = touch_segments(segments)
+    print(f"♻️  Reusing {len(segments) - len(missing)}/{len(segments)} cached segments")
+    if not missing:
+        return 0
+
+    (CACHE_DIR / 'segments').mkdir(parents=True, exist_ok=True)
+    workers = min(workers, len(missing))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    count = len(missing)
+
+    print(f"💾 Rendering {count} segments on {workers} workers...")
+    indices, specs, starts, ends, paths = zip(*missing)
+    paths = [str(path) for path in paths]
+    if workers == 1:
+        for args in zip(indices, specs, starts, ends, paths):
+            PROFILER.merge(_render_segment_file(*args, threads, encoding))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(SCALE, SCENES, PROFILER.enabled)) as pool:
+            for records in pool.map(_render_segment_file, indices, specs, starts, ends, paths,
+                                    [threads] * count, [encoding] * count):
+                PROFILER.merge(records)
+    return count
+
+def render_incremental(output_path, scenes, encoding, workers=1):
+    """Render only the segments whose inputs changed, then stitch every segment"""
+    segments = plan_segments(scenes, encoding)
+    render_segments(segments, encoding, workers)
+
+    print("🔗 Joining segments...")
+    concat_videos([str(segment[-1]) for segment in segments], output_path)
+    prune_segments(keep={segment[-1] for segment in segments})
+    return sum(segment[3] - segment[2] for segment in segments) / encoding.fps
+
+def variant_from_user(user):
+    """Batch variant personalized from a user export record (see server/get-all-users.js)"""
+    name, email = (user.get('name') or '').strip(), (user.get('email') or '').strip()
+    label = name or email or str(user['_id'])
+    # Greet by first name, else by the email's local part; with neither the spec's own tagline stays
+    greeting = name.split()[0] if name else email.partition('@')[0]
+    slots = {'tagline': f"{greeting}, plan your perfect celebration"} if greeting else {}
+
+    priorities = (user.get('onboardingData') or {}).get('topPriority') or []
+    if priorities:
+        slots['dashboard_features'] = [f"✨ {priority}" for priority in priorities[:4]]
+
+    return {'name': re.sub(r'[^a-z0-9]+', '-', label.lower()).strip('-'), 'slots': slots}
+
+def load_variants(path):
+    """Load batch variants: [{"name": ..., "slots": {...}}, ...] or a users export like data/all-users.json"""
+    with open(path, encoding='utf-8') as f:
+        records = json.load(f)
+    return [record if 'slots' in record else variant_from_user(record) for record in records]
+
+def render_batch(variants, output_dir, encoding, workers=None):
+    """Render one video per variant, sharing every segment that variants have in common
+
+    Segments are keyed by content, so scenes no slot touches are rendered
+    once for the whole batch and variants with equal overrides share theirs.
+    Only the unique missing segments go through the worker pool; each
+    variant is then a lossless concat of cached segments.
+    """
+    scenes = range(len(SCENES))
+    plans, names = [], set()
+    for variant in variants:
+        name = variant['name']
+        suffix = 2
+        while name in names:
+            name, suffix = f"{variant['name']}-{suffix}", suffix + 1
+        names.add(name)
+        specs = apply_variant(SCENES, variant.get('slots', {}))
+        plans.append((name, plan_segments(scenes, encoding, specs)))
+
+    unique = {segment[-1]: segment for _, segments in plans for segment in segments}
+    print(f"🎬 Rendering {len(plans)} variants from {len(unique)} unique segments...")
+    render_segments(list(unique.values()), encoding, workers or os.cpu_count() or 1)
+
+    print("🔗 Joining variants...")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        jobs = [pool.submit(concat_videos, [str(segment[-1]) for segment in segments],
+                            str(output_dir / f'vivaha-demo-{name}.mp4'))
+                for name, segments in plans]
+        for job in jobs:
+            job.result()
+    prune_segments(keep=set(unique))
+
+    print(f"✅ {len(plans)} videos created in {output_dir}")
+
+def export_contact_sheet(path, scenes, thumb_width=480):
+    """Save a PNG grid of keyframes, one row per scene"""
+    rows = []
+    for index in scenes:
+        scene = build_scene(index)
+        times = [CROSSFADE, 1.0, scene.duration / 2, scene.duration - 1.0 / FPS]
+        row = []
+        for t in times:
+            thumb = Image.fromarray(scene.get_frame(t).astype('uint8'))
+            thumb_height = round(thumb_width * thumb.height / thumb.width)
+            row.append(thumb.resize((thumb_width, thumb_height), Image.LANCZOS))
+        rows.append(row)
+
+    gap = 8
+    cell_width, cell_height = rows[0][0].size
+    columns = max(len(row) for row in rows)
+    sheet = Image.new('RGB', (columns * (cell_width + gap) + gap, len(rows) * (cell_height + gap) + gap),
+                      COLORS['dark'])
+    for r, row in enumerate(rows):
+        for c, thumb in enumerate(row):
+            sheet.paste(thumb, (gap + c * (cell_width + gap), gap + r * (cell_height + gap)))
+    sheet.save(path)
+
+def create_demo_video(output_path=OUTPUT_PATH, scenes=None, encoding=Encoding(),
+                      parallel=False, workers=None, incremental=False):
+    """Compile all scenes (or the selected scene indices) into final video"""
+    print("🎬 Creating Vivaha demo video...")
+    scenes = list(range(len(SCENES))) if scenes is None else scenes
+
+    if incremental:
+        workers = (workers or os.cpu_count() or 1) if parallel else 1
+        duration = render_incremental(output_path, scenes, encoding, workers)
+    elif parallel:
+        duration = render_scenes_parallel(output_path, scenes, encoding, workers)
+    else:
+        duration = render_timeline(output_path, scenes, encoding)
+
+    width, height = frame_size()
     print(f"✅ Video created successfully: {output_path}")
-    print(f"📊 Duration: {final_video.duration:.1f} seconds")
-    print(f"📐 Resolution: {WIDTH}x{HEIGHT}")
+    print(f"📊 Duration: {duration:.1f} seconds")
+    print(f"📐 Resolution: {width}x{height} @ {encoding.fps} fps")
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the Vivaha product demo video")
+    parser.add_argument('-o', '--output', default=None,
+                        help=f"output .mp4 path (default: {OUTPUT_PATH}, or vivaha-demo-preview.mp4 next to it)")
+    parser.add_argument('--parallel', action='store_true',
+                        help="render scenes in a process pool and join them without re-encoding")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --parallel and --variants (default: CPU count)")
+    parser.add_argument('--spec', default=str(SCENE_SPEC),
+                        help="scene spec to render (.json, or .yaml with PyYAML installed)")
+    parser.add_argument('--incremental', action='store_true',
+                        help=f"cache {SEGMENT_SECONDS}s segments by content hash and re-render only changed ones")
+    parser.add_argument('--variants', metavar='JSON', default=None,
+                        help="batch-render one video per variant (variants list or a users export)")
+    parser.add_argument('--output-dir', default=None,
+                        help="where --variants writes vivaha-demo-<name>.mp4 (default: variants/ next to the output)")
+    parser.add_argument('--preview', action='store_true',
+                        help=f"fast draft render: {PREVIEW_HEIGHT}p, {PREVIEW_FPS} fps, ultrafast preset")
+    parser.add_argument('--scene', type=int, action='append', metavar='N',
+                        help="render only scene N of the spec; repeat to pick several")
+    parser.add_argument('--height', type=int, default=None, help="output height in pixels")
+    parser.add_argument('--fps', type=int, default=None, help=f"frames per second (default: {FPS})")
+    parser.add_argument('--preset', default=None, help="x264 preset (default: medium)")
+    parser.add_argument('--engine', choices=['moviepy', 'stream'], default='moviepy',
+                        help="encoder path: moviepy's write_videofile, or raw frames piped to ffmpeg")
+    parser.add_argument('--max-memory', type=int, metavar='MB', default=None,
+                        help="cap the streaming engine's in-flight frame buffers")
+    parser.add_argument('--contact-sheet', metavar='PNG', default=None,
+                        help="also save a keyframe contact sheet of the rendered scenes")
+    parser.add_argument('--no-video', action='store_true', help="skip the video (with --contact-sheet)")
+    parser.add_argument('--profile', metavar='JSON', default=None,
+                        help="write per-scene/per-stage timings, frames/sec and peak memory")
+    parser.add_argument('--trace', metavar='JSON', default=None,
+                        help="write a Chrome trace (chrome://tracing, Perfetto, speedscope)")
+    args = parser.parse_args()
+    PROFILER.enabled = bool(args.profile or args.trace)
+
+    height = args.height or (PREVIEW_HEIGHT if args.preview else HEIGHT)
+    fps = args.fps or (PREVIEW_FPS if args.preview else FPS)
+    preset = args.preset or ('ultrafast' if args.preview else 'medium')
+    output = args.output or (str(Path(OUTPUT_PATH).with_name('vivaha-demo-preview.mp4'))
+                             if args.preview else OUTPUT_PATH)
+
+    set_scale(height / HEIGHT)
+    set_scenes(load_scenes(args.spec))
+
+    # Checked against the loaded spec, which need not have the default's scene count
+    invalid = [n for n in args.scene or [] if not 1 <= n <= len(SCENES)]
+    if invalid:
+        parser.error(f"--scene must be between 1 and {len(SCENES)} for {args.spec} (got {invalid[0]})")
+    scenes = [n - 1 for n in args.scene] if args.scene else None
+
+    if args.contact_sheet:
+        export_contact_sheet(args.contact_sheet, scenes or range(len(SCENES)))
+        print(f"🖼️  Contact sheet saved: {args.contact_sheet}")
+
+    encoding = Encoding(fps, preset, args.engine, args.max_memory)
+    if args.variants:
+        output_dir = args.output_dir or Path(output).with_name('variants')
+        render_batch(load_variants(args.variants), output_dir, encoding, args.workers)
+    elif not args.no_video:
+        create_demo_video(output, scenes=scenes, encoding=encoding,
+                          parallel=args.parallel, workers=args.workers,
+                          incremental=args.incremental)
+
+    if args.profile:
+        with open(args.profile, 'w') as f:
+            json.dump(PROFILER.report(), f, indent=2)
+        print(f"⏱️  Profile saved: {args.profile}")
+    if args.trace:
+        with open(args.trace, 'w') as f:
+            json.dump(PROFILER.trace(), f)
+        print(f"🔥 Trace saved: {args.trace}")
 
 if __name__ == "__main__":
-    create_demo_video()
+    main()
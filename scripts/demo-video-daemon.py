@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Vivaha Demo Video Render Daemon
+Keeps create-demo-video.py loaded in a pool of warm worker processes and
+renders jobs submitted over a Unix socket.
+
+The server pays for moviepy, ffmpeg discovery and ImageMagick once; its
+workers keep their rasterized text, sprites and scene plates between jobs.
+Each job is split into the same content-hashed segments as --incremental,
+so segments shared by concurrent jobs (or cached by earlier ones) are
+rendered once. The client only uses the standard library and starts fast.
+
+A worker that dies (e.g. OOM-killed) breaks the pool: it is replaced and
+the jobs waiting on it retry their segments once. Workers' in-memory caches
+are bounded (TEXT_CACHE_SIZE and friends), and after each job the segment
+cache is pruned back to --cache-mb, never touching a running job's segments.
+
+Usage:
+  python scripts/demo-video-daemon.py serve --workers 4 &
+  python scripts/demo-video-daemon.py submit --preview --scene 2 --slot tagline="Hi Priya" -o hi.mp4
+  python scripts/demo-video-daemon.py status
+  python scripts/demo-video-daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPT = Path(__file__).with_name('create-demo-video.py')
+
+# Same default as create-demo-video.py's CACHE_DIR, without importing it
+CACHE_DIR = Path(os.environ.get('VIVAHA_VIDEO_CACHE', Path.home() / '.cache' / 'vivaha-demo'))
+SOCKET_PATH = Path(os.environ.get('VIVAHA_RENDER_SOCKET', CACHE_DIR / 'render.sock'))
+
+# create-demo-video.py, loaded by the server (and inherited or loaded by its workers)
+VIDEO = None
+
+def load_video_module():
+    """Import create-demo-video.py under a name pool workers can unpickle it by"""
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location('demo_video', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['demo_video'] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _render_segment(scale, index, spec, start_frame, end_frame, path, threads, encoding):
+    """Pool task: render one segment at the job's scale
+
+    Forked workers inherit the server's warm module; spawned ones load it
+    on their first task and keep it. The encoding travels as a plain tuple
+    so unpickling the task never needs the module.
+    """
+    global VIDEO
+    if VIDEO is None:
+        VIDEO = load_video_module()
+    VIDEO.set_scale(scale)
+    VIDEO._render_segment_file(index, spec, start_frame, end_frame, path, threads, VIDEO.Encoding(*encoding))
+
+class RenderServer:
+    """Plan jobs into segments, run them on a shared process pool and stitch each job's output"""
+
+    def __init__(self, workers, cache_mb):
+        import threading
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.workers = workers
+        self.threads = max(1, (os.cpu_count() or 1) // workers)
+        self.cache_mb = cache_mb
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        # Bumped each time a broken pool is replaced
+        self.generation = 0
+        # Planning touches the module's global render scale
+        self.lock = threading.Lock()
+        self.inflight = {}
+        # Segment path -> running jobs that will concat it (kept out of pruning)
+        self.pinned = Counter()
+        self.started = time.time()
+        self.jobs = {'done': 0, 'failed': 0, 'running': 0}
+
+    def encoding(self, job):
+        """Encoding and scale for a job, with create-demo-video.py's defaults"""
+        preview = job.get('preview', False)
+        height = job.get('height') or (VIDEO.PREVIEW_HEIGHT if preview else VIDEO.HEIGHT)
+        fps = job.get('fps') or (VIDEO.PREVIEW_FPS if preview else VIDEO.FPS)
+        preset = job.get('preset') or ('ultrafast' if preview else 'medium')
+        return VIDEO.Encoding(fps, preset, job.get('engine') or 'stream'), height / VIDEO.HEIGHT
+
+    def output(self, job):
+        if job.get('output'):
+            return job['output']
+        if job.get('preview'):
+            return str(Path(VIDEO.OUTPUT_PATH).with_name('vivaha-demo-preview.mp4'))
+        return VIDEO.OUTPUT_PATH
+
+    def plan(self, job):
+        """(segments, encoding, scale) of a job; raises ValueError for a bad job"""
+        encoding, scale = self.encoding(job)
+        specs = VIDEO.load_scenes(job['spec']) if job.get('spec') else VIDEO.SCENES
+        specs = VIDEO.apply_variant(specs, job.get('slots') or {})
+        scenes = [n - 1 for n in job.get('scenes') or range(1, len(specs) + 1)]
+        if any(not 0 <= index < len(specs) for index in scenes):
+            raise ValueError(f"Scenes must be between 1 and {len(specs)}")
+
+        with self.lock:
+            VIDEO.set_scale(scale)
+            segments = VIDEO.plan_segments(scenes, encoding, specs)
+        return segments, encoding, scale
+
+    def submit(self, segment, encoding, scale):
+        """Future rendering `segment`, shared with any job already waiting for the same one"""
+        index, spec, start, end, path = segment
+        with self.lock:
+            future = self.inflight.get(path)
+            if future is None:
+                future = self.pool.submit(_render_segment, scale, index, spec, start, end, str(path),
+                                          self.threads, tuple(encoding))
+                self.inflight[path] = future
+            else:
+                return future
+        # Outside the lock: the callback runs at once if the task already finished
+        future.add_done_callback(lambda _: self.forget(path, future))
+        return future
+
+    def forget(self, path, future):
+        with self.lock:
+            if self.inflight.get(path) is future:
+                del self.inflight[path]
+
+    def replace_pool(self, generation):
+        """Swap in a fresh pool if the one of `generation` is still current (it broke)"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self.lock:
+            if self.generation != generation:
+                return  # another job already replaced it
+            broken, self.pool = self.pool, ProcessPoolExecutor(max_workers=self.workers)
+            self.generation += 1
+            # Every future of the broken pool has failed; drop them so retries resubmit
+            self.inflight.clear()
+        broken.shutdown(wait=False, cancel_futures=True)
+        print(f"⚠️  A render worker died; replaced the pool (generation {self.generation})", file=sys.stderr)
+
+    def count(self, name, change=1):
+        with self.lock:
+            self.jobs[name] += change
+
+    def render(self, job, send):
+        """Run one job, reporting progress through send(event dict)"""
+        self.count('running')
+        try:
+            self._render(job, send)
+            self.count('done')
+        except Exception:
+            self.count('failed')
+            raise
+        finally:
+            self.count('running', -1)
+
+    def _render(self, job, send):
+        clock = time.perf_counter()
+        segments, encoding, scale = self.plan(job)
+        paths = [segment[-1] for segment in segments]
+        (VIDEO.CACHE_DIR / 'segments').mkdir(parents=True, exist_ok=True)
+        # Pinned before the cache is checked, so pruning never removes a segment this job counts on
+        with self.lock:
+            self.pinned.update(paths)
+            missing = VIDEO.touch_segments(segments)
+        try:
+            send({'event': 'queued', 'segments': len(segments), 'cached': len(segments) - len(missing)})
+            self.wait(missing, encoding, scale, send)
+
+            output = self.output(job)
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            VIDEO.concat_videos([str(path) for path in paths], output)
+        finally:
+            with self.lock:
+                self.pinned -= Counter(paths)
+                VIDEO.prune_segments(self.cache_mb, keep=set(self.pinned))
+        send({'event': 'done', 'output': output, 'seconds': round(time.perf_counter() - clock, 2),
+              'duration': sum(segment[3] - segment[2] for segment in segments) / encoding.fps})
+
+    def wait(self, missing, encoding, scale, send):
+        """Render the `missing` segments, retrying once on a fresh pool if a worker dies"""
+        from concurrent.futures import as_completed
+        from concurrent.futures.process import BrokenProcessPool
+
+        total, done = len(missing), 0
+        for attempt in range(2):
+            generation = self.generation
+            try:
+                for future in as_completed([self.submit(segment, encoding, scale) for segment in missing]):
+                    future.result()
+                    done += 1
+                    send({'event': 'progress', 'done': done, 'total': total})
+                return
+            except BrokenProcessPool:
+                self.replace_pool(generation)
+                if attempt:
+                    raise
+                missing = [segment for segment in missing if not segment[-1].exists()]
+                done = total - len(missing)
+
+def serve(path, workers, cache_mb=None):
+    """Load the renderer, fork the worker pool and answer requests until `stop`"""
+    import socketserver
+    import threading
+
+    global VIDEO
+    VIDEO = load_video_module()
+    server_state = RenderServer(workers, VIDEO.SEGMENT_CACHE_MB if cache_mb is None else cache_mb)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def send(event):
+                self.wfile.write(json.dumps(event).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+            try:
+                message = json.loads(self.rfile.readline())
+                command = message.get('command')
+                if command == 'status':
+                    send(server_state.status())
+                elif command == 'stop':
+                    send({'event': 'stopping'})
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                elif command == 'render':
+                    server_state.render(message.get('job') or {}, send)
+                else:
+                    send({'event': 'error', 'message': f"Unknown command {command!r}"})
+            except BrokenPipeError:
+                pass
+            except Exception as error:  # report any job failure to its client, keep serving
+                try:
+                    send({'event': 'error', 'message': f"{type(error).__name__}: {error}"})
+                except OSError:
+                    pass
+
+    if path.exists():
+        try:
+            next(request(path, {'command': 'status'}), None)
+        except OSError:
+            path.unlink()  # left behind by a daemon that died
+        else:
+            sys.exit(f"❌ A render daemon is already listening on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Fork the workers now, before the server threads exist
+    list(server_state.pool.map(abs, range(workers)))
+
+    server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    server.daemon_threads = True
+    print(f"🎬 Render daemon ready on {path} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+        server_state.pool.shutdown(cancel_futures=True)
+    print("👋 Render daemon stopped")
+
+def request(path, message):
+    """Send one request; yields the server's events as they arrive"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as events:
+            for line in events:
+                yield json.loads(line)
+
+def print_event(event):
+    kind = event['event']
+    if kind == 'queued':
+        print(f"♻️  Reusing {event['cached']}/{event['segments']} cached segments")
+    elif kind == 'progress':
+        print(f"💾 Rendered {event['done']}/{event['total']} segments")
+    elif kind == 'done':
+        print(f"✅ Video created successfully: {event['output']}")
+        print(f"📊 Duration: {event['duration']:.1f} seconds, rendered in {event['seconds']:.1f} s")
+    elif kind == 'error':
+        print(f"❌ {event['message']}", file=sys.stderr)
+    elif kind == 'status':
+        jobs = event['jobs']
+        print(f"🎬 Daemon {event['pid']}: {event['workers']} workers, up {event['uptime']:.0f} s")
+        print(f"   {jobs['running']} running, {jobs['done']} done, {jobs['failed']} failed jobs; "
+              f"{event['segments_in_flight']} segments in flight")
+    elif kind == 'stopping':
+        print("👋 Stopping the render daemon")
+
+def submit(path, message, as_json=False):
+    """Send a request and print its events; returns the exit code"""
+    try:
+        events = request(path, message)
+        failed = False
+        for event in events:
+            failed = failed or event['event'] == 'error'
+            if as_json:
+                print(json.dumps(event), flush=True)
+            else:
+                print_event(event)
+                sys.stdout.flush()
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No render daemon on {path} (start one with: {sys.argv[0]} serve)", file=sys.stderr)
+        return 2
+    return 1 if failed else 0
+
+def parse_slot(text):
+    """NAME=TEXT, or NAME=["a", "b"] for list slots"""
+    name, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=TEXT, got {text!r}")
+    if value.startswith('['):
+        try:
+            value = json.loads(value)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(f"bad list for slot {name}: {error}")
+    return name, value
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm render daemon for the Vivaha demo video")
+    parser.add_argument('--socket', type=Path, default=SOCKET_PATH,
+                        help=f"Unix socket path (default: {SOCKET_PATH}, or $VIVAHA_RENDER_SOCKET)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="run the daemon in the foreground")
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help="render worker processes (default: CPU count)")
+    serve_parser.add_argument('--cache-mb', type=int, default=None,
+                              help="prune the segment cache to this size after each job "
+                                   "(default: $VIVAHA_SEGMENT_CACHE_MB or 4096)")
+
+    job = commands.add_parser('submit', help="render a video on the daemon")
+    job.add_argument('-o', '--output', default=None, help="output .mp4 path (default: as create-demo-video.py)")
+    job.add_argument('--scene', type=int, action='append', metavar='N', help="render only scene N; repeatable")
+    job.add_argument('--slot', type=parse_slot, action='append', metavar='NAME=TEXT',
+                     help="override a scene slot's copy; repeatable")
+    job.add_argument('--spec', default=None, help="scene spec to render (default: the daemon's)")
+    job.add_argument('--preview', action='store_true', help="fast draft render")
+    job.add_argument('--height', type=int, default=None, help="output height in pixels")
+    job.add_argument('--fps', type=int, default=None, help="frames per second")
+    job.add_argument('--preset', default=None, help="x264 preset")
+    job.add_argument('--engine', choices=['moviepy', 'stream'], default='stream', help="encoder path")
+    job.add_argument('--json', action='store_true', help="print raw progress events as JSON lines")
+
+    commands.add_parser('status', help="show the daemon's workers and jobs")
+    commands.add_parser('stop', help="shut the daemon down")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket, max(1, args.workers), args.cache_mb)
+    elif args.command == 'submit':
+        message = {'command': 'render', 'job': {
+            'output': os.path.abspath(args.output) if args.output else None,
+            'scenes': args.scene,
+            'slots': dict(args.slot or []),
+            'spec': os.path.abspath(args.spec) if args.spec else None,
+            'preview': args.preview,
+            'height': args.height,
+            'fps': args.fps,
+            'preset': args.preset,
+            'engine': args.engine,
+        }}
+        sys.exit(submit(args.socket, message, args.json))
+    else:
+        sys.exit(submit(args.socket, {'command': args.command}))
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import os
-import re
+from pathlib import Path
+
+import codemod
+import tstokens
 
 files = [
     'BudgetTracker.tsx',
@@ -11,31 +14,65 @@ files = [
     'Dashboard.tsx'
 ]
 
-base_path = '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard'
-
-for filename in files:
-    filepath = os.path.join(base_path, filename)
-    if not os.path.exists(filepath):
-        continue
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Skip if already imported
-    if 'userDataStorage' in content and "from '../../utils/userDataStorage'" in content:
-        print(f"✅ {filename} - userDataStorage already imported")
-        continue
-    
-    # Find the last import line
-    imports = re.findall(r"^import .+ from .+;$", content, re.MULTILINE)
-    if not imports:
-        print(f"⚠️  {filename} - No imports found, skipping")
-        continue
-    
-    last_import = imports[-1]
-    new_import = "import { userDataStorage } from '../../utils/userDataStorage';"
-    content = content.replace(last_import, last_import + '\n' + new_import, 1)
-    
-    with open(filepath, 'w') as f:
-        f.write(content)
-    print(f"✅ {filename} - Added userDataStorage import")
+module = codemod.CLIENT_SRC / 'utils/userDataStorage'
+
+def imports(content):
+    """(end, specifier, names) of each top-level static import, in order
+
+    end is just past the module specifier and its optional ';' (files
+    without semicolons are common); names are the name tokens imported.
+    """
+    tokens = tstokens.Scan(content).tokens
+    found, depth, i = [], 0, 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind == 'punct' and token.text in tstokens.OPENERS:
+            depth += 1
+        elif token.kind == 'punct' and token.text in (')', ']', '}'):
+            depth = max(depth - 1, 0)
+        elif (depth == 0 and token.kind == 'name' and token.text == 'import'
+              and (i == 0 or tokens[i - 1].text != '.')
+              and i + 1 < len(tokens) and tokens[i + 1].text not in ('(', '.')):
+            # The first string after `import` is the module specifier
+            j = i + 1
+            while j < len(tokens) and tokens[j].kind != 'string':
+                j += 1
+            if j == len(tokens):
+                break
+            end = tokens[j + 1].end if j + 1 < len(tokens) and tokens[j + 1].text == ';' else tokens[j].end
+            found.append((end, tstokens.string_value(tokens[j].text),
+                          {t.text for t in tokens[i + 1:j] if t.kind == 'name'}))
+            i = j
+        i += 1
+    return found
+
+def add_import(content, path):
+    # Only client code can import it, and only files that use it need to
+    if codemod.CLIENT_SRC not in path.parents or path.with_suffix('') == module:
+        return content
+    if 'userDataStorage.' not in content:
+        return content
+
+    source = os.path.relpath(module, path.parent)
+    if not source.startswith('.'):
+        source = './' + source
+
+    # Skip if already imported, whatever the quotes or spelling of the path
+    statements = imports(content)
+    for _, specifier, names in statements:
+        if specifier and specifier.startswith('.') and 'userDataStorage' in names \
+                and Path(os.path.normpath(path.parent / specifier)).with_suffix('') == module:
+            return content
+
+    new_import = f"import {{ userDataStorage }} from '{source}';"
+
+    # After the last import statement (which may span lines), else at the top
+    if not statements:
+        return new_import + '\n' + content
+    end = statements[-1][0]
+    return content[:end] + '\n' + new_import + content[end:]
+
+RULES = [codemod.transform('add_userDataStorage_import', add_import, files=files)]
+
+if __name__ == "__main__":
+    codemod.main(['add_imports'])
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Audit built bundles (assets/index-*.js) and other large files for raw
+localStorage / sessionStorage calls.
+
+Files are memory-mapped and matched with a bytes-level pattern, so a
+multi-megabyte minified bundle is never read into a Python string or
+copied; only the matches themselves are. Each hit is reported with its
+line and byte column.
+
+Usage:
+  python scripts/fixes/bundlescan.py                        # assets/index-*.js
+  python scripts/fixes/bundlescan.py --user-keys --check    # fail on user data outside userDataStorage
+  python scripts/fixes/bundlescan.py --key budget dist/assets/*.js
+"""
+
+import argparse
+import json
+import mmap
+import re
+import sys
+from collections import Counter, namedtuple
+
+from codemod import REPO_ROOT
+from keyindex import KeyIndex
+
+DEFAULT_GLOBS = ['assets/index-*.js', 'client/dist/assets/*.js']
+
+# Storage call with an optional literal first argument; minifiers switch quote styles freely.
+# window./globalThis./self. reach the same storage, so they are part of the call.
+STORAGE_CALL = re.compile(
+    rb"(?<![\w$.])(?:(?:window|globalThis|self)\s*\.\s*)?(localStorage|sessionStorage)\s*\.\s*(getItem|setItem|removeItem|clear)\s*\(\s*"
+    rb"(?:([\"'`])([^\"'`\\\n]{0,200})\3)?")
+
+NEWLINE = re.compile(rb'\n')
+
+OPS = {b'getItem': 'get', b'setItem': 'set', b'removeItem': 'remove', b'clear': 'clear'}
+
+# key is None when the call's key is computed (or for clear())
+Hit = namedtuple('Hit', 'path line column api op key')
+
+def scan_file(path, pattern=STORAGE_CALL):
+    """Yield a Hit per storage call in `path`, in file order"""
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+    with mm:
+        line, counted = 1, 0
+        for match in pattern.finditer(mm):
+            start = match.start()
+            line += sum(1 for _ in NEWLINE.finditer(mm, counted, start))
+            counted = start
+            column = start - (mm.rfind(b'\n', 0, start) + 1) + 1
+            key = match.group(4)
+            yield Hit(str(path), line, column, match.group(1).decode(), OPS[match.group(2)],
+                      None if key is None else key.decode('utf-8', 'replace'))
+
+def default_paths():
+    return sorted(path for pattern in DEFAULT_GLOBS for path in REPO_ROOT.glob(pattern))
+
+def user_keys():
+    """Keys the client routes through userDataStorage, from the storage-key index"""
+    with KeyIndex() as index:
+        return {ref.key for ref in index.query("api = 'userDataStorage' AND NOT dynamic")}
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan bundles for raw localStorage/sessionStorage calls")
+    parser.add_argument('paths', nargs='*', help="files to scan (default: assets/index-*.js, client/dist/assets/*.js)")
+    parser.add_argument('--key', action='append', default=[], help="only report this key; repeatable")
+    parser.add_argument('--user-keys', action='store_true',
+                        help="only report keys the source stores through userDataStorage (see keyindex.py)")
+    parser.add_argument('--json', action='store_true', help="print hits as JSON")
+    parser.add_argument('--check', action='store_true', help="exit 1 if anything is reported")
+    args = parser.parse_args()
+
+    paths = args.paths or default_paths()
+    keys = set(args.key) | (user_keys() if args.user_keys else set())
+
+    hits = [hit for path in paths for hit in scan_file(path)
+            if not keys or hit.key in keys]
+
+    if args.json:
+        print(json.dumps([hit._asdict() for hit in hits], indent=2))
+    else:
+        for hit in hits:
+            print(f"  {hit.path}:{hit.line}:{hit.column}  {hit.op:6} {hit.api}  {hit.key or '<computed>'}")
+        print(f"\n🔍 {len(hits)} call(s) in {len(paths)} file(s)")
+        for key, count in Counter(hit.key or '<computed>' for hit in hits).most_common(10):
+            print(f"  {count:5}  {key}")
+
+    if args.check and hits:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
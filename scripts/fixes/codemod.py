@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Single-pass codemod engine for the localStorage -> userDataStorage migration.
+
+Loads the RULES of every scripts/fixes pass, compiles the rules that apply to
+a file into one combined matcher and rewrites each file with a single read,
+an in-memory rescan until nothing changes (rules feed into each other, e.g.
+fix_localstorage output is picked up by fix_all_json) and at most one write.
+
+Files are tokenized (tstokens.py) so that matches inside comments, strings
+and template literals are left alone, and call rules get balanced argument
+lists instead of guessing where a call ends with a regex.
+
+With --tree the rules are no longer limited to the dashboard files they
+list: every .ts/.tsx under client/src (and server/src with --server) that
+.gitignore does not exclude is rewritten, spread over a process pool.
+Rule sets that set TREE_SCOPED = True (the per-file literal replacements)
+keep their file lists even then.
+
+Files already known to be clean for the current rules (see filecache.py)
+are skipped without being read; --no-cache rescans everything.
+
+Rewrites are held in memory until every file has been processed. They are
+then either printed as a unified diff (--dry-run) or written as one batch:
+every new file is staged next to its target and fsynced, and only once all
+of them are staged are they renamed into place. A target edited since it
+was read (say, saved from an editor) stops the batch, and an error while
+renaming puts back the files already replaced, so a failed write leaves the
+tree as it was; only a hard kill midway can leave it half written, with
+the originals kept as .NAME.*.codemod-orig beside them.
+
+Usage:
+  python scripts/fixes/codemod.py                  # every rule set
+  python scripts/fixes/codemod.py fix_all_json     # just the named rule sets
+  python scripts/fixes/codemod.py --tree --workers 8
+  python scripts/fixes/codemod.py --tree --dry-run > migration.diff
+"""
+
+import argparse
+import difflib
+import fnmatch
+import importlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext, redirect_stdout
+from functools import lru_cache
+from glob import escape as glob_escape
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+import tstokens
+from filecache import FileCache, fingerprint
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DASHBOARD = REPO_ROOT / 'client/src/components/dashboard'
+CLIENT_SRC = REPO_ROOT / 'client/src'
+SERVER_SRC = REPO_ROOT / 'server/src'
+SOURCE_SUFFIXES = ('.ts', '.tsx')
+
+# Files per task handed to a --tree worker
+CHUNK_SIZE = 16
+
+# Threads staging files for a batch write
+WRITE_THREADS = 8
+
+# Rule sets, in the order their rules take priority
+RULE_SETS = [
+    'fix_localstorage',
+    'fix_remaining',
+    'fix_all_json',
+    'fix_json_wrapping',
+    'fix_budget_parsing',
+    'add_imports',
+]
+
+# Safety net against rules that keep re-matching their own output
+MAX_PASSES = 10
+
+# pattern/flags: a regex; replacement: a template string or a function of the match;
+# files: dashboard file names the rule is limited to (None = every file)
+Rule = namedtuple('Rule', 'name pattern replacement files flags')
+
+# callee: dotted name such as 'JSON.parse'; rewrite(call) -> replacement for
+# the whole call expression, or None to leave it (see tstokens.Call)
+CallRule = namedtuple('CallRule', 'name callee rewrite files')
+
+# Whole-file rewrite applied after the rules, e.g. adding an import;
+# apply(content, path) -> new content
+Transform = namedtuple('Transform', 'name apply files')
+
+class ChangedOnDisk(OSError):
+    """A file edited after the codemod read it"""
+
+INLINE_FLAGS = {re.IGNORECASE: 'i', re.MULTILINE: 'm', re.DOTALL: 's', re.VERBOSE: 'x'}
+
+def literal(old, new, files=None):
+    """Rule replacing an exact string"""
+    return Rule(old, re.escape(old), lambda match: new, files, 0)
+
+def regex(pattern, replacement, files=None, flags=0):
+    """Rule replacing a regular expression, like re.sub"""
+    return Rule(pattern, pattern, replacement, files, flags)
+
+def call(callee, rewrite, files=None):
+    """Rule rewriting calls of `callee`, with their arguments split at top-level commas"""
+    return CallRule(callee, callee, rewrite, files)
+
+def transform(name, apply, files=None):
+    """Whole-file rewrite: apply(content, path) -> new content"""
+    return Transform(name, apply, files)
+
+def load_rules(rule_sets=None):
+    """Import each rule set module and collect its RULES, named '<set>#<n>'"""
+    rules = []
+    for set_name in rule_sets or RULE_SETS:
+        module = importlib.import_module(set_name)
+        for i, rule in enumerate(module.RULES, 1):
+            rules.append(rule._replace(name=f"{set_name}#{i}"))
+    return rules
+
+class Matcher:
+    """All regex rules for one file compiled into a single alternation
+
+    Alternatives keep rule order, so when two rules match at the same place
+    the earlier one wins. Each hit is re-matched with its own rule's regex so
+    group references in templates keep their original numbering. Matches
+    starting inside a comment, string or template literal are left as-is.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.compiled = [re.compile(rule.pattern, rule.flags) for rule in rules]
+        alternatives = []
+        for i, rule in enumerate(rules):
+            pattern = rule.pattern
+            letters = ''.join(letter for flag, letter in INLINE_FLAGS.items() if rule.flags & flag)
+            if letters:
+                pattern = f'(?{letters}:{pattern})'
+            alternatives.append(f'(?P<r{i}>{pattern})')
+        self.combined = re.compile('|'.join(alternatives)) if rules else None
+
+    def sub(self, content, hits, scan):
+        if self.combined is None:
+            return content
+
+        def replace(match):
+            if not scan.in_code(match.start()):
+                return match.group()
+            i = next(int(name[1:]) for name, text in match.groupdict().items() if text is not None)
+            rule = self.rules[i]
+            own = self.compiled[i].fullmatch(match.group()) or match
+            hits[rule.name] += 1
+            if callable(rule.replacement):
+                return rule.replacement(own)
+            return own.expand(rule.replacement)
+
+        return self.combined.sub(replace, content)
+
+@lru_cache(maxsize=None)
+def literal_prefix(pattern, flags):
+    """Text every match of `pattern` starts with ('' if none can be derived)"""
+    if flags & re.IGNORECASE:
+        return ''
+    prefix = []
+    for op, arg in sre_parse.parse(pattern, flags):
+        if op is not sre_parse.LITERAL:
+            break
+        prefix.append(chr(arg))
+    return ''.join(prefix)
+
+def applies_to(rule, path):
+    return rule.files is None or (path.name in rule.files and path.parent == DASHBOARD)
+
+def apply_calls(content, rules, hits, scan):
+    """Rewrite the calls the rules match; a call inside one rewritten this pass waits for the next"""
+    by_callee = {}
+    for rule in rules:
+        by_callee.setdefault(rule.callee, []).append(rule)
+
+    pieces, last = [], 0
+    for found in scan.calls(by_callee):
+        if found.start < last:
+            continue
+        for rule in by_callee[found.callee]:
+            replacement = rule.rewrite(found)
+            if replacement is not None:
+                hits[rule.name] += 1
+                pieces += [content[last:found.start], replacement]
+                last = found.end
+                break
+    pieces.append(content[last:])
+    return ''.join(pieces)
+
+def rewrite(content, rules, path, hits, matchers=None):
+    """Apply every rule for `path` to `content`; returns the new content"""
+    regex_rules = [rule for rule in rules if isinstance(rule, Rule) and applies_to(rule, path)]
+    call_rules = [rule for rule in rules if isinstance(rule, CallRule) and applies_to(rule, path)]
+    matchers = {} if matchers is None else matchers
+
+    for _ in range(MAX_PASSES):
+        # A big alternation defeats re's first-character scan, so only rules
+        # whose leading text occurs in this version of the file take part
+        candidates = [rule for rule in regex_rules if literal_prefix(rule.pattern, rule.flags) in content]
+        live_calls = [rule for rule in call_rules if rule.callee in content]
+        if not candidates and not live_calls:
+            break
+        scan = tstokens.Scan(content)
+
+        key = tuple(rule.name for rule in candidates)
+        if key not in matchers:
+            matchers[key] = Matcher(candidates)
+        updated = matchers[key].sub(content, hits, scan)
+        if updated == content:
+            updated = apply_calls(content, live_calls, hits, scan)
+        if updated == content:
+            break
+        content = updated
+
+    for rule in rules:
+        if isinstance(rule, Transform) and applies_to(rule, path):
+            updated = rule.apply(content, path)
+            if updated != content:
+                hits[rule.name] += 1
+                content = updated
+    return content
+
+def target_files(rules, root=DASHBOARD):
+    """Every file some rule is limited to, in first-mention order"""
+    names = {}
+    for rule in rules:
+        for name in rule.files or []:
+            names.setdefault(name, None)
+    return [root / name for name in names]
+
+def rules_fingerprint(rule_sets, scoped=True):
+    """Changes whenever the engine, a rule set module or the scoping changes"""
+    modules = [importlib.import_module(set_name) for set_name in rule_sets]
+    return fingerprint(Path(__file__).read_text(), tstokens, *modules, scoped)
+
+def unscoped(rules):
+    """The same rules, applied to every file rather than the ones they list
+
+    Rules from a set with TREE_SCOPED = True keep their file lists: their
+    replacements were written for those exact dashboard files.
+    """
+    return [rule if getattr(importlib.import_module(rule.name.partition('#')[0]), 'TREE_SCOPED', False)
+            else rule._replace(files=None) for rule in rules]
+
+def gitignore_patterns(directory):
+    path = directory / '.gitignore'
+    if not path.exists():
+        return []
+    with open(path, 'r') as f:
+        lines = [line.strip() for line in f]
+    return [(directory, line) for line in lines if line and not line.startswith('#')]
+
+def is_ignored(path, is_dir, patterns):
+    """Match `path` against (base directory, pattern) pairs, last match wins"""
+    ignored = False
+    for base, pattern in patterns:
+        negate = pattern.startswith('!')
+        pattern = pattern.lstrip('!')
+        if pattern.endswith('/'):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip('/')
+        relative = path.relative_to(base).as_posix()
+        if '/' in pattern:
+            matched = fnmatch.fnmatch(relative, pattern.lstrip('/'))
+        else:
+            matched = fnmatch.fnmatch(path.name, pattern)
+        if matched:
+            ignored = not negate
+    return ignored
+
+def walk_sources(root):
+    """os.walk fallback for trees outside git, honouring .gitignore files"""
+    patterns = []
+    for parent in reversed([root, *root.parents]):
+        if parent == REPO_ROOT or REPO_ROOT in parent.parents:
+            patterns += gitignore_patterns(parent)
+
+    def walk(directory, patterns):
+        patterns = patterns + gitignore_patterns(directory) if directory != root else patterns
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ('.git', 'node_modules') and not is_ignored(path, True, patterns):
+                    yield from walk(path, patterns)
+            elif path.suffix in SOURCE_SUFFIXES and not is_ignored(path, False, patterns):
+                yield path
+
+    yield from walk(root, patterns)
+
+def discover_files(roots):
+    """Every .ts/.tsx under `roots` that .gitignore does not exclude"""
+    roots = [root for root in roots if root.is_dir()]
+    try:
+        listed = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard', '--', *roots],
+            cwd=REPO_ROOT, capture_output=True, check=True,
+        ).stdout.decode().split('\0')
+        files = {REPO_ROOT / name for name in listed if name.endswith(SOURCE_SUFFIXES)}
+        return sorted(path for path in files if path.exists())
+    except (OSError, subprocess.CalledProcessError):
+        return [path for root in roots for path in walk_sources(root)]
+
+def rewrite_file(path, rules, hits, matchers=None):
+    """(original, rewritten) contents of `path`, or None if it is missing"""
+    if not path.exists():
+        return None
+
+    with open(path, 'r') as f:
+        original = f.read()
+    return original, rewrite(original, rules, path, hits, matchers)
+
+def run(rules, paths):
+    """Rewrite each file in memory
+
+    Returns ({path: changed}, per-rule hit Counter, {path: (original, rewritten)}
+    for the files that changed); nothing is written.
+    """
+    hits, results, rewrites, matchers = Counter(), {}, {}, {}
+    for path in paths:
+        contents = rewrite_file(path, rules, hits, matchers)
+        results[path] = None if contents is None else contents[0] != contents[1]
+        if results[path]:
+            rewrites[path] = contents
+    return results, hits, rewrites
+
+_worker_rules = None
+
+def _init_worker(rule_sets, scoped):
+    # Rules hold lambdas, so each worker rebuilds them from the set names
+    global _worker_rules
+    _worker_rules = load_rules(rule_sets)
+    if not scoped:
+        _worker_rules = unscoped(_worker_rules)
+
+def _rewrite_chunk(paths):
+    return run(_worker_rules, paths)
+
+def run_parallel(rule_sets, paths, workers=None, scoped=False):
+    """run() across a process pool, merging the per-chunk results"""
+    hits, results, rewrites = Counter(), {}, {}
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(rule_sets, scoped)) as pool:
+        for chunk_results, chunk_hits, chunk_rewrites in pool.map(_rewrite_chunk, chunks):
+            results.update(chunk_results)
+            hits.update(chunk_hits)
+            rewrites.update(chunk_rewrites)
+    return results, hits, rewrites
+
+def unified_diff(rewrites):
+    """One git-style unified diff of every rewrite"""
+    chunks = []
+    for path, (original, content) in sorted(rewrites.items()):
+        name = path.relative_to(REPO_ROOT).as_posix()
+        chunks.extend(difflib.unified_diff(original.splitlines(keepends=True), content.splitlines(keepends=True),
+                                           f'a/{name}', f'b/{name}'))
+    return ''.join(chunks)
+
+def _signature(path):
+    """What an edit to `path` changes: (mtime, size, inode)"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+def _stage(path, original, content):
+    """Write `content` to an fsynced temp file beside `path`
+
+    Returns (temp path, _signature of `path`); raises ChangedOnDisk if
+    `path` no longer holds `original`.
+    """
+    before = _signature(path)
+    with open(path, 'r') as f:
+        if f.read() != original:
+            raise ChangedOnDisk(f"{path} changed since it was read")
+
+    fd, staged = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.codemod', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(staged, os.stat(path).st_mode & 0o7777)
+    except BaseException:
+        os.unlink(staged)
+        raise
+    return staged, before
+
+def write_batch(rewrites, threads=WRITE_THREADS):
+    """Write every rewrite or none of them
+
+    Staged files left by an interrupted batch are removed first. Files are
+    staged in parallel, each only if it still holds what was read; if any
+    staging fails the rest are removed and nothing is replaced. Then each
+    target is hard-linked to a backup, checked once more for an edit and
+    renamed over; if that fails for any file, the ones already replaced
+    are restored from their backups. Every touched directory is fsynced once.
+    """
+    for path in rewrites:
+        for leftover in path.parent.glob(f'.{glob_escape(path.name)}.*.codemod'):
+            leftover.unlink()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {pool.submit(_stage, path, original, content): path
+                   for path, (original, content) in rewrites.items()}
+        wait(futures)
+    staged = {path: future.result() for future, path in futures.items() if not future.exception()}
+    failed = [future.exception() for future in futures if future.exception()]
+    if failed:
+        for temp, _ in staged.values():
+            os.unlink(temp)
+        raise failed[0]
+
+    backups, replaced = {}, []
+    try:
+        for path, (temp, before) in staged.items():
+            backups[path] = f'{temp}-orig'
+            os.link(path, backups[path])
+            if _signature(path) != before:
+                raise ChangedOnDisk(f"{path} changed since it was read")
+            os.replace(temp, path)
+            replaced.append(path)
+    except BaseException:
+        for path in reversed(replaced):
+            os.replace(backups.pop(path), path)
+        for path, (temp, _) in staged.items():
+            if path not in replaced:
+                os.unlink(temp)
+        for backup in backups.values():
+            if os.path.exists(backup):
+                os.unlink(backup)
+        raise
+
+    for backup in backups.values():
+        os.unlink(backup)
+    for directory in {path.parent for path in staged}:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def migrate(rule_sets, rules, paths, workers=None, tree=False, use_cache=True, dry_run=False):
+    """Rewrite `paths`, skipping files the cache knows are clean; returns ({path: changed}, hits)
+
+    With `dry_run` the unified diff is printed instead of writing. Files
+    are recorded as clean once written (or when nothing needed changing),
+    so a rerun with the same rules only reads files edited since.
+    """
+    cache = FileCache('codemod', rules_fingerprint(rule_sets, not tree)) if use_cache else None
+    with cache or nullcontext():
+        stale = [path for path in paths if cache is None or cache.get(path) is None]
+        if tree:
+            results, hits, rewrites = run_parallel(rule_sets, stale, workers)
+        else:
+            results, hits, rewrites = run(rules, stale)
+
+        if dry_run:
+            sys.stdout.write(unified_diff(rewrites))
+        else:
+            write_batch(rewrites)
+
+        if cache is not None:
+            for path, changed in results.items():
+                if changed is False or (changed and not dry_run):
+                    cache.put(path, 'clean')
+            print(f"🗂️  {cache.summary()}", file=sys.stderr if dry_run else sys.stdout)
+    return {path: results.get(path, False) for path in paths}, hits
+
+def report(rules, results, hits, quiet=False, dry_run=False):
+    for path, changed in results.items():
+        name = path.relative_to(REPO_ROOT) if quiet else path.name
+        if changed is None:
+            print(f"⏭️  SKIPPED {name} (not found)")
+        elif changed:
+            print(f"✅ {name} - {'Would be rewritten' if dry_run else 'Rewritten'}")
+        elif not quiet:
+            print(f"⚠️  {name} - No changes needed")
+
+    print("\n📊 Rule hits:")
+    for rule in rules:
+        if hits[rule.name]:
+            if isinstance(rule, Rule):
+                preview = rule.pattern
+            elif isinstance(rule, CallRule):
+                preview = f"{rule.callee}(...) {rule.rewrite.__name__}"
+            else:
+                preview = rule.apply.__name__
+            print(f"  {hits[rule.name]:4}  {rule.name:22} {preview[:60]}")
+    print(f"\n✨ {sum(1 for changed in results.values() if changed)} of {len(results)} file(s) changed, "
+          f"{sum(hits.values())} rewrite(s)")
+
+def main(rule_sets=None):
+    parser = argparse.ArgumentParser(description="Apply the scripts/fixes codemod rule sets")
+    if rule_sets is None:
+        parser.add_argument('rule_sets', nargs='*', metavar='RULE_SET',
+                            help=f"rule sets to apply (default: {', '.join(RULE_SETS)})")
+    parser.add_argument('--tree', action='store_true',
+                        help="rewrite every .ts/.tsx under client/src, not just the files each rule lists")
+    parser.add_argument('--server', action='store_true', help="with --tree, also include server/src")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for --tree (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="rescan every file instead of skipping ones unchanged since the last run")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print a unified diff of the rewrites instead of writing them")
+    args = parser.parse_args()
+    rule_sets = rule_sets or args.rule_sets or RULE_SETS
+
+    rules = load_rules(rule_sets)
+    if args.tree:
+        paths = discover_files([CLIENT_SRC, SERVER_SRC] if args.server else [CLIENT_SRC])
+        rules = unscoped(rules)
+    else:
+        paths = target_files(rules)
+
+    try:
+        results, hits = migrate(rule_sets, rules, paths, args.workers, tree=args.tree,
+                                use_cache=not args.no_cache, dry_run=args.dry_run)
+    except ChangedOnDisk as e:
+        print(f"❌ {e}; nothing was written, rerun to pick up the edit", file=sys.stderr)
+        sys.exit(1)
+    # The diff goes to stdout; keep the summary out of it
+    with redirect_stdout(sys.stderr) if args.dry_run else nullcontext():
+        report(rules, results, hits, quiet=args.tree, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    # Rule set modules `import codemod`; make that this module, not a second copy
+    sys.modules.setdefault('codemod', sys.modules[__name__])
+    main()
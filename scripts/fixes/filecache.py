@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Persistent per-file result cache for the codemods and analyzers.
+
+Each entry records a file's mtime, size and content hash together with a
+fingerprint of the rules that produced the result. A file whose mtime and
+size are unchanged is a hit without being read; one that was touched but
+hashes the same is a hit too. Any change to the rules changes the
+fingerprint and invalidates every entry for that tool.
+
+The index is a single SQLite file, $VIVAHA_FIXES_CACHE or
+~/.cache/vivaha-fixes/files.sqlite3.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+CACHE_PATH = Path(os.environ.get('VIVAHA_FIXES_CACHE',
+                                 Path.home() / '.cache' / 'vivaha-fixes' / 'files.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    tool TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (tool, path)
+)
+"""
+
+def content_digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def fingerprint(*parts):
+    """Hash rule definitions: modules and functions by source, anything else by repr"""
+    h = hashlib.sha256()
+    for part in parts:
+        if inspect.ismodule(part) or inspect.isfunction(part) or inspect.isclass(part):
+            part = inspect.getsource(part)
+        h.update(repr(part).encode('utf-8'))
+    return h.hexdigest()
+
+class FileCache:
+    """Results of `tool` per file, valid while the file and `rules_fingerprint` are unchanged
+
+    Use as a context manager; entries are committed in one transaction on exit.
+    """
+
+    def __init__(self, tool, rules_fingerprint, path=CACHE_PATH):
+        self.tool = tool
+        self.fingerprint = rules_fingerprint
+        self.path = Path(path)
+        self.db = None
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.execute(SCHEMA)
+        # One tool's rules changed: its stale entries can never hit again
+        with self.db:
+            self.db.execute("DELETE FROM files WHERE tool = ? AND fingerprint != ?",
+                            (self.tool, self.fingerprint))
+        self.entries = {
+            path: (mtime_ns, size, digest, result)
+            for path, mtime_ns, size, digest, result in self.db.execute(
+                "SELECT path, mtime_ns, size, digest, result FROM files WHERE tool = ?", (self.tool,))
+        }
+        self.pending = {}
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.pending:
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.tool, path, mtime_ns, size, digest, self.fingerprint, result)
+                     for path, (mtime_ns, size, digest, result) in self.pending.items()])
+        self.db.close()
+        self.db = None
+
+    def get(self, path):
+        """The cached result for `path`, or None if it is missing or stale"""
+        key = str(Path(path).resolve())
+        entry = self.entries.get(key)
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+
+        if entry is not None:
+            mtime_ns, size, digest, result = entry
+            if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                self.hits += 1
+                return json.loads(result)
+            if stat.st_size == size:
+                with open(key, 'rb') as f:
+                    if content_digest(f.read()) == digest:
+                        # Touched but not edited: refresh the stat so the next run skips the read
+                        self.pending[key] = (stat.st_mtime_ns, size, digest, result)
+                        self.hits += 1
+                        return json.loads(result)
+        self.misses += 1
+        return None
+
+    def put(self, path, result, data=None):
+        """Record `result` for the current contents of `path` (read again unless `data` is given)"""
+        key = str(Path(path).resolve())
+        stat = os.stat(key)
+        if data is None:
+            with open(key, 'rb') as f:
+                data = f.read()
+        entry = (stat.st_mtime_ns, stat.st_size, content_digest(data), json.dumps(result))
+        self.entries[key] = self.pending[key] = entry
+
+    def summary(self):
+        return f"{self.hits} cached, {self.misses} scanned"
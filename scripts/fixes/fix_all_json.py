@@ -1,60 +1,47 @@
 #!/usr/bin/env python3
-import re
-import os
+import codemod
+import tstokens
 
 files_to_fix = [
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/VendorManagement.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/RegistryManager.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/TodoList.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/CeremonyPlanning.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/Settings.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/VendorSearch.tsx',
-    '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/SeatingPlanner.tsx',
+    'VendorManagement.tsx',
+    'RegistryManager.tsx',
+    'TodoList.tsx',
+    'CeremonyPlanning.tsx',
+    'Settings.tsx',
+    'VendorSearch.tsx',
+    'SeatingPlanner.tsx',
 ]
 
-for filepath in files_to_fix:
-    if not os.path.exists(filepath):
-        print(f"⏭️  {os.path.basename(filepath)} - not found")
-        continue
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    original = content
-    
-    # Fix 1: userDataStorage.setData(..., JSON.stringify(...)) -> userDataStorage.setData(..., ...)
-    content = re.sub(
-        r"userDataStorage\.setData\('([^']+)',\s*JSON\.stringify\(([^)]+)\)\)",
-        r"userDataStorage.setData('\1', \2)",
-        content
-    )
-    
-    # Fix 2: JSON.parse(userDataStorage.getData(...) || '[]') -> userDataStorage.getData(...) || []
-    content = re.sub(
-        r"JSON\.parse\(userDataStorage\.getData\('([^']+)'\)\s*\|\|\s*'(\[\])'\)",
-        r"userDataStorage.getData('\1') || []",
-        content
-    )
-    
-    # Fix 3: JSON.parse(userDataStorage.getData(...) || '{}') -> userDataStorage.getData(...) || {}
-    content = re.sub(
-        r"JSON\.parse\(userDataStorage\.getData\('([^']+)'\)\s*\|\|\s*'(\{\})'\)",
-        r"userDataStorage.getData('\1') || {}",
-        content
-    )
-    
-    # Fix 4: JSON.parse(userDataStorage.getData(...) || 'null') -> userDataStorage.getData(...)
-    content = re.sub(
-        r"JSON\.parse\(userDataStorage\.getData\('([^']+)'\)\s*\|\|\s*'null'\)",
-        r"userDataStorage.getData('\1')",
-        content
-    )
-    
-    if content != original:
-        with open(filepath, 'w') as f:
-            f.write(content)
-        print(f"✅ {os.path.basename(filepath)} - Fixed JSON parsing/serialization")
-    else:
-        print(f"⚠️  {os.path.basename(filepath)} - No changes needed")
+# Stored fallback -> what it becomes once userDataStorage does the parsing
+FALLBACKS = {"'[]'": " || []", "'{}'": " || {}", "'null'": ""}
 
-print("\n✨ All files processed!")
+def unwrap_stringify(call):
+    """Fix 1: userDataStorage.setData(..., JSON.stringify(...)) -> userDataStorage.setData(..., ...)"""
+    if len(call.args) != 2 or tstokens.string_value(call.args[0]) is None:
+        return None
+    value = tstokens.parse_call(call.args[1])
+    if value is None or value.callee != 'JSON.stringify' or len(value.args) != 1:
+        return None
+    return f"userDataStorage.setData({call.args[0]}, {value.args[0]})"
+
+def unwrap_parse(call):
+    """Fixes 2-4: JSON.parse(userDataStorage.getData(...) || '[]') -> userDataStorage.getData(...) || []
+
+    '{}' becomes {} and 'null' is dropped the same way.
+    """
+    parts = tstokens.split_top(call.args[0], '||') if len(call.args) == 1 else []
+    if len(parts) != 2 or parts[1] not in FALLBACKS:
+        return None
+    stored = tstokens.parse_call(parts[0])
+    if stored is None or stored.callee != 'userDataStorage.getData' or len(stored.args) != 1 \
+            or tstokens.string_value(stored.args[0]) is None:
+        return None
+    return f"userDataStorage.getData({stored.args[0]}){FALLBACKS[parts[1]]}"
+
+RULES = [
+    codemod.call('userDataStorage.setData', unwrap_stringify, files=files_to_fix),
+    codemod.call('JSON.parse', unwrap_parse, files=files_to_fix),
+]
+
+if __name__ == "__main__":
+    codemod.main(['fix_all_json'])
@@ -1,41 +1,45 @@
 #!/usr/bin/env python3
-import re
-
-filepath = '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard/BudgetTracker.tsx'
-
-with open(filepath, 'r') as f:
-    content = f.read()
-
-# Fix pattern 1: userDataStorage.setData with JSON.stringify
-content = re.sub(
-    r"userDataStorage\.setData\('budget',\s*JSON\.stringify\((.*?)\)\)",
-    r"userDataStorage.setData('budget', \1)",
-    content,
-    flags=re.DOTALL
-)
-
-# Fix pattern 2: JSON.parse(userDataStorage.getData('budget'))
-content = re.sub(
-    r"JSON\.parse\(userDataStorage\.getData\('budget'\)\)",
-    r"userDataStorage.getData('budget')",
-    content
-)
-
-# Fix pattern 3: cached = userDataStorage.getData followed by JSON.parse(cached)
-content = re.sub(
-    r"const cached = userDataStorage\.getData\('budget'\);\s*if \(cached\) setCategories\(JSON\.parse\(cached\)\);",
-    r"const cached = userDataStorage.getData('budget');\n      if (cached && Array.isArray(cached)) setCategories(cached);",
-    content
-)
-
-# Fix another pattern of same thing
-content = re.sub(
-    r"const cached = userDataStorage\.getData\('budget'\);\s*if \(cached\) \{ setCategories\(JSON\.parse\(cached\)\);",
-    r"const cached = userDataStorage.getData('budget');\n      if (cached && Array.isArray(cached)) { setCategories(cached);",
-    content
-)
-
-with open(filepath, 'w') as f:
-    f.write(content)
-
-print("✅ Fixed BudgetTracker.tsx - removed double JSON parsing")
+import codemod
+import tstokens
+
+files_to_fix = ['BudgetTracker.tsx']
+
+def is_budget(text):
+    return tstokens.string_value(text) == 'budget'
+
+def unwrap_stringify(call):
+    """Fix pattern 1: userDataStorage.setData with JSON.stringify"""
+    if len(call.args) != 2 or not is_budget(call.args[0]):
+        return None
+    value = tstokens.parse_call(call.args[1])
+    if value is None or value.callee != 'JSON.stringify' or len(value.args) != 1:
+        return None
+    return f"userDataStorage.setData('budget', {value.args[0]})"
+
+def unwrap_parse(call):
+    """Fix pattern 2: JSON.parse(userDataStorage.getData('budget'))"""
+    stored = tstokens.parse_call(call.args[0]) if len(call.args) == 1 else None
+    if stored is None or stored.callee != 'userDataStorage.getData' or len(stored.args) != 1 \
+            or not is_budget(stored.args[0]):
+        return None
+    return "userDataStorage.getData('budget')"
+
+RULES = [
+    codemod.call('userDataStorage.setData', unwrap_stringify, files=files_to_fix),
+    codemod.call('JSON.parse', unwrap_parse, files=files_to_fix),
+    # Fix pattern 3: cached = userDataStorage.getData followed by JSON.parse(cached)
+    codemod.regex(
+        r"const cached = userDataStorage\.getData\('budget'\);\s*if \(cached\) setCategories\(JSON\.parse\(cached\)\);",
+        r"const cached = userDataStorage.getData('budget');\n      if (cached && Array.isArray(cached)) setCategories(cached);",
+        files=files_to_fix,
+    ),
+    # Fix another pattern of same thing
+    codemod.regex(
+        r"const cached = userDataStorage\.getData\('budget'\);\s*if \(cached\) \{ setCategories\(JSON\.parse\(cached\)\);",
+        r"const cached = userDataStorage.getData('budget');\n      if (cached && Array.isArray(cached)) { setCategories(cached);",
+        files=files_to_fix,
+    ),
+]
+
+if __name__ == "__main__":
+    codemod.main(['fix_budget_parsing'])
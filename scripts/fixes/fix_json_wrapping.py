@@ -1,52 +1,28 @@
 #!/usr/bin/env python3
-import os
-import re
+import codemod
+import tstokens
 
-files_to_fix = {
-    'GuestList.tsx': [
-        ("JSON.parse(userDataStorage.getData('guests') || '[]')", "userDataStorage.getData('guests') || []"),
-        ("JSON.stringify(guests)", "guests"),
-    ],
-    'RegistryManager.tsx': [
-        ("JSON.parse(userDataStorage.getData('registries') || '[]')", "userDataStorage.getData('registries') || []"),
-        ("JSON.stringify(", ""),  # This needs special handling
-    ],
-    'Settings.tsx': [
-        ("JSON.parse(userDataStorage.getData('onboarding') || '{}')", "userDataStorage.getData('onboarding') || {}"),
-        ("JSON.stringify(settings)", "settings"),
-    ],
-    'VendorManagement.tsx': [
-        ("JSON.parse(userDataStorage.getData('myVendors') || '[]')", "userDataStorage.getData('myVendors') || []"),
-        ("JSON.stringify(", ""),  # Needs special handling
-    ],
-    'Overview.tsx': [
-        ("JSON.parse(userDataStorage.getData('onboarding') || 'null')", "userDataStorage.getData('onboarding')"),
-    ],
-}
+files_to_fix = [
+    'GuestList.tsx',
+    'RegistryManager.tsx',
+    'Settings.tsx',
+    'VendorManagement.tsx',
+    'Overview.tsx',
+]
 
-base_path = '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard'
+# userDataStorage.getData() should NOT be wrapped in JSON.parse
+# It handles serialization internally
+def unwrap_parse(call):
+    parts = tstokens.split_top(call.args[0], '||') if len(call.args) == 1 else []
+    if len(parts) != 2 or tstokens.string_value(parts[1]) is None:
+        return None
+    stored = tstokens.parse_call(parts[0])
+    if stored is None or stored.callee != 'userDataStorage.getData' or len(stored.args) != 1 \
+            or tstokens.string_value(stored.args[0]) is None:
+        return None
+    return f"userDataStorage.getData({stored.args[0]}) || {'{}' if tstokens.string_value(parts[1]) == '{}' else '[]'}"
 
-for filename, replacements in files_to_fix.items():
-    filepath = os.path.join(base_path, filename)
-    if not os.path.exists(filepath):
-        continue
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Handle specific patterns more carefully
-    # userDataStorage.getData() should NOT be wrapped in JSON.parse 
-    # It handles serialization internally
-    
-    # Replace JSON.parse wrapped calls
-    content = re.sub(
-        r"JSON\.parse\(userDataStorage\.getData\('(\w+)'\) \|\| '(.*?)'\)",
-        lambda m: f"userDataStorage.getData('{m.group(1)}') || {'{}' if m.group(2) == '{}' else '[]'}",
-        content
-    )
-    
-    with open(filepath, 'w') as f:
-        f.write(content)
-    print(f"✅ {filename} - Fixed JSON wrapping")
+RULES = [codemod.call('JSON.parse', unwrap_parse, files=files_to_fix)]
 
-print("\n✨ JSON serialization fixes applied!")
+if __name__ == "__main__":
+    codemod.main(['fix_json_wrapping'])
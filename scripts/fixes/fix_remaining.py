@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import os
+import codemod
 
 files_to_fix = {
     'CeremonyPlanning.tsx': [
@@ -32,27 +32,14 @@ files_to_fix = {
     ],
 }
 
-base_path = '/Users/pratiktanikella/Vivaha_repo/client/src/components/dashboard'
+# Literal replacements for these exact files: keep them scoped under --tree
+TREE_SCOPED = True
 
-for filename, replacements in files_to_fix.items():
-    filepath = os.path.join(base_path, filename)
-    if not os.path.exists(filepath):
-        print(f"⏭️  SKIPPED {filename} (not found)")
-        continue
-    
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    original = content
-    for old, new in replacements:
-        content = content.replace(old, new)
-    
-    if content != original:
-        with open(filepath, 'w') as f:
-            f.write(content)
-        count = sum(1 for old, new in replacements if old in original)
-        print(f"✅ {filename} - Fixed {count} pattern(s)")
-    else:
-        print(f"⚠️  {filename} - No changes needed")
+RULES = [
+    codemod.literal(old, new, files={filename})
+    for filename, replacements in files_to_fix.items()
+    for old, new in replacements
+]
 
-print("\n✨ All remaining fixes applied!")
+if __name__ == "__main__":
+    codemod.main(['fix_remaining'])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Storage isolation rules (see isolation.rules) compiled into one matcher.
+
+Every forbid rule's calls and keys go into a single regex, so each file is
+scanned once however many keys and rules there are; a hit is then looked
+up against the rules and allowlist by (api, op, key) and path. Hits inside
+comments, strings and template literals are ignored.
+"""
+
+import fnmatch
+import re
+from collections import namedtuple
+from pathlib import Path
+
+import tstokens
+
+RULES_PATH = Path(__file__).with_name('isolation.rules')
+
+DEFAULT_GLOB = 'client/src/*'
+
+# window.localStorage and friends reach the same API as the bare global
+GLOBAL_PREFIX = r"(?:window|globalThis|self)\s*\.\s*"
+
+# Leaks every forbid rule must catch, in each form a call can take ({call} is
+# e.g. localStorage.getItem, {key} one of the rule's keys); see Verifier.missed_seeds
+SEEDED_LEAKS = [
+    "{call}('{key}');",
+    "window.{call}(\"{key}\");",
+    "const text = `saved: ${{{call}('{key}')}}`;",
+    "const text = `${{items.map(item => `${{item}}: ${{{call}(`{key}`)}}`)}}`;",
+]
+
+# calls: {(api, op)}; keys: frozenset, or None for any literal key
+Forbid = namedtuple('Forbid', 'line calls keys glob')
+Allow = namedtuple('Allow', 'line glob keys')
+Violation = namedtuple('Violation', 'path line column call key rule')
+
+class RuleError(ValueError):
+    """A malformed line in a rules file"""
+
+def parse_rules(text, source='isolation.rules'):
+    """(forbid rules, allow rules) from rules-file text"""
+    key_lists, forbids, allows = {}, [], []
+    for number, line in enumerate(text.splitlines(), 1):
+        words = line.split('#', 1)[0].split()
+        if not words:
+            continue
+        where = f"{source}:{number}"
+        command, args = words[0], words[1:]
+
+        if command == 'keys':
+            if len(args) < 3 or args[1] != '=':
+                raise RuleError(f"{where}: expected 'keys NAME = KEY ...'")
+            key_lists.setdefault(args[0], set()).update(args[2:])
+        elif command == 'forbid':
+            glob = DEFAULT_GLOB
+            if len(args) == 4 and args[2] == 'in':
+                glob = args[3]
+            elif len(args) != 2:
+                raise RuleError(f"{where}: expected 'forbid API.OP[|OP] KEYS [in GLOB]'")
+            api, _, ops = args[0].rpartition('.')
+            api = re.sub(rf"^{GLOBAL_PREFIX}", '', api)
+            if not api or not ops:
+                raise RuleError(f"{where}: expected API.OP, got {args[0]!r}")
+            if args[1] == '*':
+                keys = None
+            elif args[1].startswith('@'):
+                if args[1][1:] not in key_lists:
+                    raise RuleError(f"{where}: unknown key list {args[1]}")
+                keys = frozenset(key_lists[args[1][1:]])
+            else:
+                keys = frozenset([args[1]])
+            forbids.append(Forbid(number, frozenset((api, op) for op in ops.split('|')), keys, glob))
+        elif command == 'allow':
+            if not args:
+                raise RuleError(f"{where}: expected 'allow GLOB [KEY ...]'")
+            allows.append(Allow(number, args[0], frozenset(args[1:]) or None))
+        else:
+            raise RuleError(f"{where}: unknown command {command!r}")
+    return forbids, allows
+
+def load_rules(path=RULES_PATH):
+    path = Path(path)
+    return parse_rules(path.read_text(), path.name)
+
+class Verifier:
+    """Check files against forbid/allow rules with one combined pattern"""
+
+    def __init__(self, forbids, allows):
+        self.forbids = forbids
+        self.allows = allows
+        apis = sorted({api for rule in forbids for api, op in rule.calls})
+        ops = sorted({op for rule in forbids for api, op in rule.calls})
+        if any(rule.keys is None for rule in forbids):
+            keys = r"[^'\"`\\\n]*"
+        else:
+            keys = '|'.join(re.escape(key) for key in sorted(set().union(*(rule.keys for rule in forbids))))
+        self.pattern = re.compile(
+            rf"(?<![\w$.])(?:{GLOBAL_PREFIX})?(?P<api>{'|'.join(map(re.escape, apis))})\s*\.\s*(?P<op>{'|'.join(map(re.escape, ops))})"
+            rf"\(\s*(?P<quote>['\"`])(?P<key>{keys})(?P=quote)") if forbids else None
+
+    def applies(self, path):
+        """Whether any forbid rule covers `path` (repo-relative, posix)"""
+        return any(fnmatch.fnmatch(path, rule.glob) for rule in self.forbids)
+
+    def allowed(self, path, key):
+        return any(fnmatch.fnmatch(path, allow.glob) and (allow.keys is None or key in allow.keys)
+                   for allow in self.allows)
+
+    def missed_seeds(self):
+        """SEEDED_LEAKS some forbid rule fails to report in a file it covers, as (rule line, source)"""
+        missed = []
+        for rule in self.forbids:
+            path = rule.glob.replace('*', 'seeded').replace('?', 's')
+            api, op = min(rule.calls)
+            key = min(rule.keys) if rule.keys else 'seeded'
+            if self.allowed(path, key):
+                continue
+            for seed in SEEDED_LEAKS:
+                source = seed.format(call=f"{api}.{op}", key=key)
+                if not any(violation.rule == rule.line for violation in self.check(source, path)):
+                    missed.append((rule.line, source))
+        return missed
+
+    def check(self, source, path):
+        """Violations in one file's `source`; `path` is repo-relative"""
+        rules = [rule for rule in self.forbids if fnmatch.fnmatch(path, rule.glob)]
+        if not rules or self.pattern is None:
+            return []
+
+        violations, scan, lines = [], None, None
+        for match in self.pattern.finditer(source):
+            api, op, key = match.group('api', 'op', 'key')
+            rule = next((rule for rule in rules
+                         if (api, op) in rule.calls and (rule.keys is None or key in rule.keys)), None)
+            if rule is None or self.allowed(path, key):
+                continue
+            if scan is None:
+                scan, lines = tstokens.Scan(source), tstokens.Lines(source)
+            if not scan.in_code(match.start()):
+                continue
+            violations.append(Violation(path, *lines.position(match.start()), f"{api}.{op}", key, rule.line))
+        return violations
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Inverted index of every storage key used in client/src.
+
+Each localStorage / sessionStorage / userDataStorage call with a literal key
+is recorded as (key, file, line, column, operation, api), together with the
+keys listed in userDataStorage.clearUserData (operation 'clear'). The index
+lives in the filecache.py SQLite file; only files that changed since the
+last query are rescanned, so lookups do not re-read the tree.
+
+Usage:
+  python scripts/fixes/keyindex.py keys                 # every key with its get/set/remove/clear counts
+  python scripts/fixes/keyindex.py refs budget          # every reference to a key
+  python scripts/fixes/keyindex.py who-writes budget
+  python scripts/fixes/keyindex.py who-reads budget
+  python scripts/fixes/keyindex.py never-cleared        # keys written but never removed or cleared
+  python scripts/fixes/keyindex.py unisolated           # user keys still going straight to localStorage
+  python scripts/fixes/keyindex.py dynamic              # calls whose key is computed
+"""
+
+import argparse
+import sqlite3
+from collections import namedtuple
+from pathlib import Path
+
+import tstokens
+from codemod import CLIENT_SRC, REPO_ROOT, discover_files
+from filecache import CACHE_PATH, FileCache, fingerprint
+
+# Storage call -> (api, operation)
+OPERATIONS = {
+    'localStorage.getItem': ('localStorage', 'get'),
+    'localStorage.setItem': ('localStorage', 'set'),
+    'localStorage.removeItem': ('localStorage', 'remove'),
+    'sessionStorage.getItem': ('sessionStorage', 'get'),
+    'sessionStorage.setItem': ('sessionStorage', 'set'),
+    'sessionStorage.removeItem': ('sessionStorage', 'remove'),
+    'userDataStorage.getData': ('userDataStorage', 'get'),
+    'userDataStorage.setData': ('userDataStorage', 'set'),
+    'userDataStorage.removeData': ('userDataStorage', 'remove'),
+}
+
+# Functions whose array literals list keys they wipe
+CLEARERS = {'clearUserData'}
+
+# key: the literal key, or the key expression when `dynamic`
+Ref = namedtuple('Ref', 'key path line column op api dynamic')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS storage_keys (
+    key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    column INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    api TEXT NOT NULL,
+    dynamic INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS storage_keys_by_key ON storage_keys (key, op);
+CREATE INDEX IF NOT EXISTS storage_keys_by_path ON storage_keys (path);
+"""
+
+def definition_body(tokens, pairs, i):
+    """Index of the '{' opening the body when tokens[i] names a function being defined, else None
+
+    Matches `name: (...) => {` and `name: function (...) {` (object members),
+    `name = (...) => {` and `name(...) {` / `function name(...) {`, each with
+    optional type annotations; a call such as `store.name();` is not one.
+    """
+    following = tokens[i + 1].text if i + 1 < len(tokens) else None
+    if following == '(' and i + 1 in pairs:
+        # A method or function declaration: the body (or a return type) follows the parameters
+        j, function = pairs[i + 1] + 1, True
+        if j >= len(tokens) or tokens[j].text not in ('{', ':'):
+            return None
+    elif following in (':', '='):
+        j, function = i + 2, False
+    else:
+        return None
+
+    while j < len(tokens):
+        text = tokens[j].text
+        if text == '{':
+            return j if function else None
+        if text in (';', ',', '}', ')', ']'):
+            return None
+        if text in ('=>', 'function'):
+            function = True
+        if j in pairs and text in ('(', '['):
+            j = pairs[j]
+        j += 1
+    return None
+
+def cleared_keys(scan):
+    """(offset, key) for each string in an array literal inside a CLEARERS function definition"""
+    tokens, pairs = scan.tokens, scan.matching()
+    found = []
+    for i, token in enumerate(tokens):
+        if token.kind != 'name' or token.text not in CLEARERS:
+            continue
+        body = definition_body(tokens, pairs, i)
+        if body is None or body not in pairs:
+            continue
+        for j in range(body + 1, pairs[body]):
+            if tokens[j].kind == 'string' and tokens[j - 1].text in ('[', ',') \
+                    and tokens[j + 1].text in (',', ']'):
+                found.append((tokens[j].start, tokens[j].text[1:-1]))
+    return found
+
+def index_source(source, path):
+    """Every Ref in one file's source"""
+    scan, lines = tstokens.Scan(source), tstokens.Lines(source)
+    refs = []
+    for call in scan.calls(OPERATIONS):
+        if not call.args:
+            continue
+        api, op = OPERATIONS[call.callee]
+        key = tstokens.string_value(call.args[0])
+        refs.append(Ref(call.args[0] if key is None else key, path, *lines.position(call.start),
+                        op, api, key is None))
+    for offset, key in cleared_keys(scan):
+        refs.append(Ref(key, path, *lines.position(offset), 'clear', 'userDataStorage', False))
+    return refs
+
+class KeyIndex:
+    """Persistent storage-key index, refreshed for changed files on open"""
+
+    def __init__(self, roots=(CLIENT_SRC,), path=CACHE_PATH):
+        self.roots = roots
+        self.path = Path(path)
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.executescript(SCHEMA)
+        self.refresh()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.close()
+
+    def refresh(self):
+        """Rescan the files the cache cannot vouch for and drop files that are gone"""
+        paths = discover_files(self.roots)
+        names = {str(path.relative_to(REPO_ROOT)) for path in paths}
+        rules = fingerprint(OPERATIONS, sorted(CLEARERS), index_source, definition_body, cleared_keys, tstokens)
+        with FileCache('keyindex', rules, self.path) as cache, self.db:
+            for (name,) in self.db.execute("SELECT DISTINCT path FROM storage_keys").fetchall():
+                if name not in names:
+                    self.db.execute("DELETE FROM storage_keys WHERE path = ?", (name,))
+            for path in paths:
+                if cache.get(path) is not None:
+                    continue
+                with open(path, 'r') as f:
+                    source = f.read()
+                name = str(path.relative_to(REPO_ROOT))
+                refs = index_source(source, name)
+                self.db.execute("DELETE FROM storage_keys WHERE path = ?", (name,))
+                self.db.executemany("INSERT INTO storage_keys VALUES (?, ?, ?, ?, ?, ?, ?)", refs)
+                cache.put(path, len(refs), source.encode('utf-8'))
+
+    def query(self, where='1', params=()):
+        rows = self.db.execute(
+            f"SELECT * FROM storage_keys WHERE {where} ORDER BY key, path, line", params)
+        return [Ref(*row[:6], bool(row[6])) for row in rows]
+
+    def refs(self, key, op=None):
+        if op is None:
+            return self.query("key = ? AND NOT dynamic", (key,))
+        return self.query("key = ? AND op = ? AND NOT dynamic", (key, op))
+
+    def keys(self):
+        """{key: {op: count}} over literal keys"""
+        summary = {}
+        for key, op, count in self.db.execute(
+                "SELECT key, op, COUNT(*) FROM storage_keys WHERE NOT dynamic GROUP BY key, op ORDER BY key"):
+            summary.setdefault(key, {})[op] = count
+        return summary
+
+    def never_cleared(self):
+        """Keys written somewhere but never removed or listed in a clearer"""
+        return [key for key, ops in self.keys().items()
+                if ops.get('set') and not ops.get('remove') and not ops.get('clear')]
+
+    def unisolated(self):
+        """Raw localStorage refs to keys that userDataStorage also handles"""
+        return self.query(
+            "api = 'localStorage' AND NOT dynamic AND op != 'clear' AND key IN "
+            "(SELECT key FROM storage_keys WHERE api = 'userDataStorage')")
+
+    def dynamic(self):
+        return self.query("dynamic")
+
+def print_refs(refs):
+    for ref in refs:
+        print(f"  {ref.path}:{ref.line}:{ref.column}  {ref.op:6} {ref.api}  {ref.key}")
+    print(f"\n{len(refs)} reference(s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the storage-key index of client/src")
+    parser.add_argument('query', choices=['keys', 'refs', 'who-writes', 'who-reads', 'who-removes',
+                                          'never-cleared', 'unisolated', 'dynamic'])
+    parser.add_argument('key', nargs='?', help="storage key for refs / who-writes / who-reads / who-removes")
+    args = parser.parse_args()
+    ops = {'refs': None, 'who-writes': 'set', 'who-reads': 'get', 'who-removes': 'remove'}
+    if args.query in ops and not args.key:
+        parser.error(f"{args.query} needs a key")
+
+    with KeyIndex() as index:
+        if args.query in ops:
+            print_refs(index.refs(args.key, ops[args.query]))
+        elif args.query == 'keys':
+            for key, counts in index.keys().items():
+                print(f"  {key:28} " + '  '.join(f"{op} {counts.get(op, 0):3}"
+                                                 for op in ('get', 'set', 'remove', 'clear')))
+        elif args.query == 'never-cleared':
+            for key in index.never_cleared():
+                print(f"  {key}")
+        elif args.query == 'unisolated':
+            print_refs(index.unisolated())
+        else:
+            print_refs(index.dynamic())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Lightweight TS/TSX tokenizer for the codemods and analyzers.
+
+Yields names, numbers, punctuation, strings, template literals, regex
+literals and comments in one forward pass, so callers can find call
+expressions with balanced argument lists and ignore anything that only
+appears inside a comment or a string.
+
+A template literal comes out as its literal chunks ('template' tokens:
+`head${, }middle${, }tail`) with the code of each ${...} substitution
+tokenized in between, so calls inside substitutions are seen like any other.
+
+It is deliberately not a parser: types, JSX and ASI are not modelled.
+Quotes in JSX text (<p>Don't</p>) open a string that ends at the line
+break, which keeps the damage to that one line.
+"""
+
+import bisect
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', 'kind text start end')
+
+# start/end: span of the whole call in the source; args: argument texts, stripped
+Call = namedtuple('Call', 'callee start end args')
+
+# Kinds whose text is opaque to the rules
+OPAQUE = ('comment', 'string', 'template', 'regex')
+
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<punct>\.\.\.|\?\.|=>|[=!]==?|&&=?|\|\|=?|\?\?=?|\*\*=?|<<=?|>>>?=?|[-+*/%&|^<>]=?|\S)
+""", re.DOTALL | re.VERBOSE)
+
+_TEMPLATE_CHUNK = re.compile(r'[^`\\$]+')
+
+_REGEX_BODY = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+
+# After these a '/' starts a regex literal rather than a division
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                   'void', 'throw', 'instanceof', 'yield', 'await'}
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+def _regex_allowed(previous):
+    if previous is None:
+        return True
+    if previous.kind == 'name':
+        return previous.text in _REGEX_KEYWORDS
+    # '<' is JSX (</div>) far more often than a comparison against a regex
+    return previous.kind == 'punct' and previous.text not in (')', ']', '}', '<')
+
+def _template_chunk_end(source, j):
+    """(end, opens) of the template chunk whose text starts at `j`
+
+    The chunk ends just past the closing backtick (opens=False) or just past
+    the '${' of a substitution (opens=True).
+    """
+    while j < len(source):
+        chunk = _TEMPLATE_CHUNK.match(source, j)
+        if chunk:
+            j = chunk.end()
+            continue
+        c = source[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1, False
+        elif source.startswith('${', j):
+            return j + 2, True
+        else:
+            j += 1
+    return len(source), False
+
+def tokenize(source, pos=0):
+    """Yield every token from `pos` on, comments included, whitespace skipped"""
+    previous = None
+    # Per open ${ substitution, innermost last: '{' nesting inside it
+    substitutions = []
+    while pos < len(source):
+        c = source[pos]
+        opens = False
+        if c == '`' or (c == '}' and substitutions and substitutions[-1] == 0):
+            if c == '}':
+                substitutions.pop()
+            end, opens = _template_chunk_end(source, pos + 1)
+            if opens:
+                substitutions.append(0)
+            token = Token('template', source[pos:end], pos, end)
+        elif c == '/' and source[pos + 1:pos + 2] not in ('/', '*') and _regex_allowed(previous):
+            literal = _REGEX_BODY.match(source, pos)
+            end = literal.end() if literal else pos + 1
+            token = Token('regex' if literal else 'punct', source[pos:end], pos, end)
+        else:
+            match = _TOKEN.match(source, pos)
+            end = match.end()
+            if match.lastgroup == 'ws':
+                pos = end
+                continue
+            token = Token(match.lastgroup, match.group(), pos, end)
+            if substitutions and token.text in ('{', '}'):
+                substitutions[-1] += 1 if token.text == '{' else -1
+        yield token
+        if token.kind != 'comment':
+            # A substitution starts like an expression: '/' there opens a regex
+            previous = None if opens else token
+        pos = end
+
+class Scan:
+    """One tokenization of `source`, shared by everything that inspects it"""
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = []
+        self.opaque_starts, self.opaque_ends = [], []
+        for token in tokenize(source):
+            if token.kind in OPAQUE:
+                self.opaque_starts.append(token.start)
+                self.opaque_ends.append(token.end)
+            if token.kind != 'comment':
+                self.tokens.append(token)
+
+    def in_code(self, pos):
+        """False when `pos` falls inside a comment, string, regex or a template's literal text"""
+        i = bisect.bisect_right(self.opaque_starts, pos) - 1
+        return i < 0 or pos >= self.opaque_ends[i] or pos == self.opaque_starts[i]
+
+    def matching(self):
+        """{index of an opening bracket: index of its closing bracket}"""
+        pairs, stack = {}, []
+        for i, token in enumerate(self.tokens):
+            if token.kind != 'punct':
+                continue
+            if token.text in OPENERS:
+                stack.append(i)
+            elif token.text in (')', ']', '}'):
+                # Skip unbalanced closers instead of pairing them wrongly
+                if stack and OPENERS[self.tokens[stack[-1]].text] == token.text:
+                    pairs[stack.pop()] = i
+        return pairs
+
+    def calls(self, callees=None):
+        """Yield every call of a dotted name in `callees` (all calls if None), outermost first"""
+        tokens, pairs = self.tokens, self.matching()
+        for k, token in enumerate(tokens):
+            if token.text != '(' or k not in pairs or k == 0 or tokens[k - 1].kind != 'name':
+                continue
+            first = k - 1
+            while first >= 2 and tokens[first - 1].text == '.' and tokens[first - 2].kind == 'name':
+                first -= 2
+            callee = ''.join(t.text for t in tokens[first:k])
+            if callees is not None and callee not in callees:
+                continue
+            close = pairs[k]
+            yield Call(callee, tokens[first].start, tokens[close].end,
+                       self._split(k + 1, close, ',', pairs))
+
+    def _split(self, begin, end, separator, pairs):
+        """Texts between top-level `separator` tokens in tokens[begin:end]"""
+        parts, part_start, i = [], begin, begin
+        while i < end:
+            if i in pairs:
+                i = pairs[i] + 1
+                continue
+            if self.tokens[i].text == separator:
+                parts.append(self._text(part_start, i))
+                part_start = i + 1
+            i += 1
+        if part_start < end:
+            parts.append(self._text(part_start, end))
+        return parts
+
+    def _text(self, begin, end):
+        if begin >= end:
+            return ''
+        return self.source[self.tokens[begin].start:self.tokens[end - 1].end]
+
+    def split(self, separator):
+        """Top-level parts of the whole source around `separator`"""
+        return self._split(0, len(self.tokens), separator, self.matching())
+
+class Lines:
+    """Offset -> (line, column), both 1-based"""
+
+    def __init__(self, source):
+        self.starts = [0] + [match.end() for match in re.finditer('\n', source)]
+
+    def position(self, offset):
+        line = bisect.bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+def parse_call(text):
+    """`text` as a Call if it is exactly one call expression, else None"""
+    scan = Scan(text)
+    calls = list(scan.calls())
+    if calls and calls[0].start == scan.tokens[0].start and calls[0].end == scan.tokens[-1].end:
+        return calls[0]
+    return None
+
+def string_value(text):
+    """Contents of `text` if it is a single plain string literal, else None"""
+    tokens = list(tokenize(text))
+    if len(tokens) == 1 and tokens[0].kind == 'string' and len(tokens[0].text) >= 2 \
+            and tokens[0].text[0] == tokens[0].text[-1]:
+        return tokens[0].text[1:-1]
+    return None
+
+def split_top(text, separator):
+    """Parts of `text` around top-level `separator` tokens (e.g. '||')"""
+    return Scan(text).split(separator)
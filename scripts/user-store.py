@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Compact columnar store for user exports, for repeated ad-hoc queries.
+
+`build` streams an export (see analyze-users.py) once into a single file
+of NumPy columns. Strings (role, email, topPriority) are dictionary-encoded
+against sorted dictionaries, missing numbers are NaN and missing dates NaT.
+The file also carries secondary indexes: rows grouped by role, onboarding
+status and priority, and rows sorted by createdAt. `query` memory-maps the
+file, so columns are paged in on demand and nothing is parsed per record.
+
+Usage:
+  python scripts/user-store.py build                              # data/all-users.json
+  python scripts/user-store.py query --where role=bride --where 'budget>40k' --where 'guests>100'
+  python scripts/user-store.py query --where 'created>=2026-01-01' --where priority=Catering --list
+"""
+
+import argparse
+import bisect
+import importlib.util
+import json
+import mmap
+import re
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_EXPORT = ROOT / 'data/all-users.json'
+DEFAULT_STORE = ROOT / 'data/all-users.colstore'
+
+MAGIC = b'VIVUSERS1\n'
+ALIGN = 64
+
+NAT = np.iinfo('int64').min
+
+def load_analyzer():
+    """Import analyze-users.py (its file name is not a valid module name)"""
+    spec = importlib.util.spec_from_file_location('analyze_users', Path(__file__).with_name('analyze-users.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def timestamp_ms(value):
+    """createdAt (ISO string, or mongoexport's {"$date": ...}) as ms since the epoch; NAT if missing"""
+    if isinstance(value, dict):
+        value = value.get('$date')
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str):
+        return NAT
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return NAT
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+class Dictionary:
+    """String -> code while building; sorted (so codes order like the strings) when written"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value):
+        return self.codes.setdefault(value, len(self.codes))
+
+    def finish(self):
+        """(sorted values, old code -> new code)"""
+        values = sorted(self.codes)
+        remap = np.empty(len(values), dtype='uint32')
+        for new, value in enumerate(values):
+            remap[self.codes[value]] = new
+        return values, remap
+
+def grouped(codes, groups):
+    """Inverted index: (offsets, rows) with the rows of code c at rows[offsets[c]:offsets[c + 1]]"""
+    rows = np.argsort(codes, kind='stable').astype('uint32')
+    offsets = np.zeros(groups + 1, dtype='uint32')
+    np.cumsum(np.bincount(codes, minlength=groups), out=offsets[1:])
+    return offsets, rows
+
+def build(exports, path):
+    """Stream `exports` into a column store at `path`; returns the number of users"""
+    analyzer = load_analyzer()
+    dictionaries = {name: Dictionary() for name in ('role', 'email', 'priority')}
+    role, email, onboarded = array('I'), array('I'), array('B')
+    budget, guests, created = array('d'), array('d'), array('q')
+    priority_counts, priority_codes = array('I'), array('I')
+
+    for export in exports:
+        f = sys.stdin if export == '-' else open(export, 'r', encoding='utf-8')
+        with f:
+            for user in analyzer.iter_records(f):
+                if not isinstance(user, dict):
+                    continue
+                onboarding = user.get('onboardingData') or {}
+                role.append(dictionaries['role'].code(analyzer.role_of(user)))
+                email.append(dictionaries['email'].code(str(user.get('email') or '')))
+                onboarded.append(bool(user.get('onboardingCompleted')))
+                value = analyzer.number(onboarding.get('estimatedBudget'))
+                budget.append(np.nan if value is None else value)
+                value = analyzer.number(onboarding.get('guestCount'))
+                guests.append(np.nan if value is None else value)
+                created.append(timestamp_ms(user.get('createdAt')))
+
+                priorities = onboarding.get('topPriority') or []
+                if isinstance(priorities, str):
+                    priorities = [priorities]
+                priorities = [p.strip() for p in priorities if isinstance(p, str) and p.strip()]
+                priority_counts.append(len(priorities))
+                priority_codes.extend(dictionaries['priority'].code(p) for p in priorities)
+
+    columns = {}
+    for name, dictionary in dictionaries.items():
+        values, remap = dictionary.finish()
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype='uint64')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        columns[f'{name}.dictionary.offsets'] = offsets
+        columns[f'{name}.dictionary.data'] = np.frombuffer(b''.join(encoded), dtype='uint8')
+        dictionaries[name] = (len(values), remap)
+
+    def codes(name, values):
+        # Small dictionaries get 2-byte codes; the header records whichever width was used
+        size, remap = dictionaries[name]
+        dtype = 'uint16' if size <= np.iinfo('uint16').max + 1 else 'uint32'
+        return remap[np.frombuffer(values, dtype=np.dtype(values.typecode))].astype(dtype)
+
+    columns['role'] = codes('role', role)
+    columns['email'] = codes('email', email)
+    columns['onboarded'] = np.frombuffer(onboarded, dtype='uint8')
+    columns['budget'] = np.frombuffer(budget, dtype='float64')
+    columns['guests'] = np.frombuffer(guests, dtype='float64')
+    columns['created'] = np.frombuffer(created, dtype='int64').view('datetime64[ms]')
+    columns['priority.offsets'] = np.zeros(len(role) + 1, dtype='uint32')
+    np.cumsum(np.frombuffer(priority_counts, dtype=np.dtype(priority_counts.typecode)),
+              out=columns['priority.offsets'][1:])
+    columns['priority.codes'] = codes('priority', priority_codes)
+
+    # Secondary indexes
+    for name, groups in (('role', dictionaries['role'][0]), ('onboarded', 2)):
+        columns[f'index.{name}.offsets'], columns[f'index.{name}.rows'] = grouped(columns[name], groups)
+    owners = np.repeat(np.arange(len(role), dtype='uint32'), np.diff(columns['priority.offsets']))
+    offsets, order = grouped(columns['priority.codes'], dictionaries['priority'][0])
+    columns['index.priority.offsets'], columns['index.priority.rows'] = offsets, owners[order]
+    # NaT sorts last
+    columns['index.created.rows'] = np.argsort(columns['created'], kind='stable').astype('uint32')
+    columns['index.created.values'] = columns['created'][columns['index.created.rows']]
+
+    write_store(path, len(role), columns)
+    return len(role)
+
+def write_store(path, count, columns):
+    """MAGIC, header length (uint64), JSON header, then each column's raw bytes at an ALIGN boundary"""
+    layout, offset = {}, 0
+    for name, column in columns.items():
+        layout[name] = [column.dtype.str, offset, len(column)]
+        offset += -(-column.nbytes // ALIGN) * ALIGN
+    header = json.dumps({'count': count, 'columns': layout}).encode('utf-8')
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        for name, column in columns.items():
+            f.seek(start + layout[name][1])
+            f.write(np.ascontiguousarray(column).tobytes())
+        f.truncate(start + offset)
+    tmp_path.replace(path)
+
+class Strings:
+    """A sorted string dictionary in the store, decoded on access"""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, code):
+        return bytes(self.data[self.offsets[code]:self.offsets[code + 1]]).decode('utf-8')
+
+    def code(self, value):
+        """Code of `value`, or None when no user has it (binary search: the dictionary is sorted)"""
+        i = bisect.bisect_left(self, value)
+        return i if i < len(self) and self[i] == value else None
+
+class UserStore:
+    """A memory-mapped column store written by build()"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a user store (rebuild it with: user-store.py build)")
+        length = int.from_bytes(self.map[len(MAGIC):len(MAGIC) + 8], 'little')
+        header = json.loads(self.map[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        start = -(-(len(MAGIC) + 8 + length) // ALIGN) * ALIGN
+
+        self.count = header['count']
+        self.columns = {name: np.frombuffer(self.map, dtype=np.dtype(dtype), count=size, offset=start + offset)
+                        for name, (dtype, offset, size) in header['columns'].items()}
+        self.strings = {name: Strings(self.columns[f'{name}.dictionary.offsets'],
+                                      self.columns[f'{name}.dictionary.data'])
+                        for name in ('role', 'email', 'priority')}
+
+    def group(self, index, code):
+        """Rows (sorted) whose `index` column has `code`"""
+        offsets = self.columns[f'index.{index}.offsets']
+        if code is None or code >= len(offsets) - 1:
+            return np.zeros(0, dtype='uint32')
+        return np.sort(self.columns[f'index.{index}.rows'][offsets[code]:offsets[code + 1]])
+
+    def created_between(self, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        """Rows (sorted) created within the bounds, from the createdAt index"""
+        values = self.columns['index.created.values']
+        # NaT sorts last and never matches
+        end = len(values) - int(np.isnat(values).sum())
+        first = 0 if low is None else np.searchsorted(values[:end], low, 'left' if low_inclusive else 'right')
+        last = end if high is None else np.searchsorted(values[:end], high, 'right' if high_inclusive else 'left')
+        return np.sort(self.columns['index.created.rows'][first:last])
+
+    def priorities(self, row):
+        offsets = self.columns['priority.offsets']
+        codes = self.columns['priority.codes'][offsets[row]:offsets[row + 1]]
+        return [self.strings['priority'][code] for code in codes]
+
+    def record(self, row):
+        columns = self.columns
+        budget, guests, created = columns['budget'][row], columns['guests'][row], columns['created'][row]
+        return {
+            'email': self.strings['email'][columns['email'][row]],
+            'role': self.strings['role'][columns['role'][row]],
+            'onboarded': bool(columns['onboarded'][row]),
+            'budget': None if np.isnan(budget) else float(budget),
+            'guests': None if np.isnan(guests) else float(guests),
+            'created': None if np.isnat(created) else str(created) + 'Z',
+            'priorities': self.priorities(row),
+        }
+
+# field op value
+CONDITION = re.compile(r'^\s*(\w+)\s*(>=|<=|!=|=|>|<)\s*(.*?)\s*$')
+FIELDS = {'role': 'role', 'onboarded': 'onboarded', 'budget': 'budget', 'estimatedBudget': 'budget',
+          'guests': 'guests', 'guestCount': 'guests', 'created': 'created', 'createdAt': 'created',
+          'priority': 'priority', 'topPriority': 'priority', 'email': 'email'}
+SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+def parse_condition(text):
+    """'budget>40k' -> ('budget', '>', 40000.0); raises ValueError"""
+    match = CONDITION.match(text)
+    if not match or match.group(1) not in FIELDS:
+        raise ValueError(f"expected FIELD OP VALUE with FIELD one of {', '.join(sorted(set(FIELDS.values())))}, "
+                         f"got {text!r}")
+    field, op, value = FIELDS[match.group(1)], match.group(2), match.group(3).strip('\'"')
+
+    if field in ('budget', 'guests'):
+        number = value.replace(',', '').replace('$', '')
+        scale = SUFFIXES.get(number[-1:].lower(), 1)
+        try:
+            value = float(number[:-1] if scale > 1 else number) * scale
+        except ValueError:
+            raise ValueError(f"{field} needs a number, got {value!r}")
+    elif field == 'created':
+        ms = timestamp_ms(value)
+        if ms == NAT:
+            raise ValueError(f"created needs an ISO date, got {value!r}")
+        value = np.datetime64(ms, 'ms')
+    elif op not in ('=', '!='):
+        raise ValueError(f"{field} only supports = and !=")
+    elif field == 'onboarded':
+        if value.lower() not in ('true', 'false', 'yes', 'no', '1', '0'):
+            raise ValueError(f"onboarded needs true or false, got {value!r}")
+        value = value.lower() in ('true', 'yes', '1')
+    return field, op, value
+
+COMPARE = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+           '=': np.equal, '!=': np.not_equal}
+
+def select(store, conditions):
+    """Sorted row ids matching every condition
+
+    Equality on role, onboarded, priority and email and ranges on created
+    go through the indexes and are intersected first; the remaining
+    conditions are then evaluated vectorized over the surviving rows only.
+    """
+    rows, rest = None, []
+
+    def narrow(candidates):
+        nonlocal rows
+        rows = candidates if rows is None else np.intersect1d(rows, candidates, assume_unique=True)
+
+    for field, op, value in conditions:
+        if op == '=' and field in ('role', 'priority'):
+            narrow(store.group(field, store.strings[field].code(value)))
+        elif field == 'onboarded' and op in ('=', '!='):
+            narrow(store.group('onboarded', int(value == (op == '='))))
+        elif field == 'email' and op == '=':
+            code = store.strings['email'].code(value)
+            narrow(np.zeros(0, dtype='uint32') if code is None
+                   else np.flatnonzero(store.columns['email'] == code).astype('uint32'))
+        elif field == 'created' and op in ('>', '>=', '<', '<='):
+            if op[0] == '>':
+                narrow(store.created_between(low=value, low_inclusive=op == '>='))
+            else:
+                narrow(store.created_between(high=value, high_inclusive=op == '<='))
+        else:
+            rest.append((field, op, value))
+
+    if rows is None:
+        rows = np.arange(store.count, dtype='uint32')
+    for field, op, value in rest:
+        if not len(rows):
+            break
+        if field == 'priority':
+            # != : users without that priority among theirs
+            narrow_out = store.group('priority', store.strings['priority'].code(value))
+            rows = np.setdiff1d(rows, narrow_out, assume_unique=True)
+            continue
+        if field in ('role', 'email'):
+            code = store.strings[field].code(value)
+            column, value = store.columns[field][rows], -1 if code is None else code
+        else:
+            column = store.columns[field][rows]
+        rows = rows[COMPARE[op](column, value)]
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar store for repeated queries over user exports")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help="convert exports into a column store")
+    build_parser.add_argument('exports', nargs='*', default=[str(DEFAULT_EXPORT)],
+                              help="JSON array or NDJSON exports, '-' for stdin (default: data/all-users.json)")
+    build_parser.add_argument('-o', '--output', default=str(DEFAULT_STORE),
+                              help="store to write (default: data/all-users.colstore)")
+
+    query = commands.add_parser('query', help="count (and list) the users matching conditions")
+    query.add_argument('--store', default=str(DEFAULT_STORE), help="store to read (default: data/all-users.colstore)")
+    query.add_argument('--where', action='append', default=[], metavar='COND',
+                       help="FIELD OP VALUE, e.g. role=bride, 'budget>40k', 'created>=2026-01-01'; repeatable")
+    query.add_argument('--list', action='store_true', help="print the matching users")
+    query.add_argument('--limit', type=int, default=50, help="users to print with --list (default: 50)")
+    query.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        clock = time.perf_counter()
+        count = build(args.exports, args.output)
+        size = Path(args.output).stat().st_size
+        print(f"🗃️  Stored {count} user(s) in {args.output} ({size / 1024:,.1f} KB, "
+              f"{time.perf_counter() - clock:.2f} s)")
+        return
+
+    try:
+        conditions = [parse_condition(text) for text in args.where]
+    except ValueError as error:
+        parser.error(str(error))
+    try:
+        store = UserStore(args.store)
+    except FileNotFoundError:
+        sys.exit(f"❌ No store at {args.store} (create it with: {sys.argv[0]} build)")
+    except ValueError as error:
+        sys.exit(f"❌ {error}")
+
+    clock = time.perf_counter()
+    rows = select(store, conditions)
+    elapsed = (time.perf_counter() - clock) * 1000
+    listed = [store.record(row) for row in rows[:args.limit]] if args.list else []
+
+    if args.json:
+        result = {'count': len(rows), 'of': store.count, 'milliseconds': round(elapsed, 3)}
+        if args.list:
+            result['users'] = listed
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"👥 {len(rows)} of {store.count} user(s) match ({elapsed:.2f} ms)")
+    for user in listed:
+        budget = '-' if user['budget'] is None else f"{user['budget']:,.0f}"
+        guests = '-' if user['guests'] is None else f"{user['guests']:,.0f}"
+        print(f"  {user['email']:32} {user['role']:10} {budget:>12} {guests:>6}  {(user['created'] or '-')[:10]}")
+    if args.list and len(rows) > args.limit:
+        print(f"  … {len(rows) - args.limit} more (raise --limit)")
+
+if __name__ == "__main__":
+    main()